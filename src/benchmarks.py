@@ -0,0 +1,202 @@
+'''Benchmarks of the field, waveform and heating hot paths.
+
+Every case is timed with timeit (best of several repeats) and run once more
+under tracemalloc for its peak allocation. Results are written as JSON,
+tagged with the git commit, so that runs on two commits can be compared:
+
+    python benchmarks.py                       # full suite -> bench_<commit>.json
+    python benchmarks.py --quick -k waveform   # small sizes, matching cases only
+    python benchmarks.py --compare old.json new.json
+
+Runs headless (Agg) on a plain CPU box.
+'''
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "figures"))
+from cross_section import compute_field
+from electrodes import ElectrodeArray, ElectrodePair
+from fields import NerveGrid
+from leadfield import LeadFieldCache
+from modelling import gen_interference_signal
+from waveforms import multi_electrode_waveform, tiled_waveform
+
+SIGMA_DC = 0.3
+EPS_R = 5000
+TOTAL_I = 2e-3
+
+
+# ----------------------------------------------------------------------------
+# Cases: setup(**params) -> zero-argument callable to time
+# ----------------------------------------------------------------------------
+def bench_compute_field(N, pairs, dtype, cached):
+    grid = NerveGrid(3e-3, N)
+    config = [ElectrodePair(a, "w", "w") for a in np.linspace(0, 180, pairs, endpoint=False)]
+    cache = LeadFieldCache() if cached else None
+    compute_field(config, grid, TOTAL_I, SIGMA_DC, EPS_R, cache=cache, dtype=dtype)  # warm
+    return lambda: compute_field(config, grid, TOTAL_I, SIGMA_DC, EPS_R, cache=cache, dtype=dtype)
+
+
+def bench_array_am(N, electrodes, dtype, arc):
+    # compute_am (simulation.py) and compute_fields (full-plot.py) reduce to this kernel
+    grid = NerveGrid(1.5e-3, N)
+    array = ElectrodeArray.ring(electrodes, 1.5e-3, 1e-3,
+                                np.where(np.arange(electrodes) % 2, 22e3, 20e3),
+                                arc=None if arc is None else np.deg2rad(arc))
+    array.unit_fields(grid.xs, grid.ys, SIGMA_DC, EPS_R, dtype, grid.polar)  # warm (arc table)
+    return lambda: array.am(array.unit_fields(grid.xs, grid.ys, SIGMA_DC, EPS_R, dtype, grid.polar))
+
+
+def bench_multi_electrode_waveform(samples, electrodes):
+    f_s = 1e6
+    TD = samples / f_s
+    carriers = 20e3 + 2e3 * np.arange(electrodes)
+    return lambda: multi_electrode_waveform(1e-3, TD, 33.0, 250e-6, carriers, f_s, electrodes)
+
+
+def bench_tiled_waveform(samples, electrodes, PRF):
+    # PRF = 40 Hz is a whole number of samples at 1 MHz (tiled), 33 Hz is not (indexed)
+    f_s = 1e6
+    carriers = 20e3 + 2e3 * np.arange(electrodes)
+    return lambda: tiled_waveform(1e-3, samples / f_s, PRF, 250e-6, carriers, f_s, electrodes)
+
+
+def bench_gen_interference_signal(samples, electrodes):
+    t = np.linspace(0, samples / 1e6, samples).reshape(-1, 1)
+    freqs = 20e3 + 2e3 * np.arange(electrodes)
+    amps = np.full(electrodes, 1e-3)
+    return lambda: gen_interference_signal(freqs, amps, t)
+
+
+def bench_heating(pairs):
+    import heating
+    carrier_pairs = heating.carrier_pairs[:pairs]
+
+    def run():
+        heating.waveform_cache.clear()  # time generation, not cache hits
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [heating.carrier_pair_heating(f1, f2) for f1, f2 in carrier_pairs]
+    return run
+
+
+def grid_params(**axes):
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*axes.values())]
+
+
+def cases(quick=False):
+    N = (64, 128) if quick else (128, 256, 450)
+    samples = (10_000, 100_000) if quick else (10_000, 100_000, 1_000_000)
+    dtypes = (np.float32, np.float64)
+    return (
+        [("compute_field", bench_compute_field, p) for p in
+         grid_params(N=N, pairs=(1, 3), dtype=dtypes, cached=(False, True))]
+        + [("array_am", bench_array_am, p) for p in
+           grid_params(N=N, electrodes=(2, 8, 16), dtype=dtypes, arc=(None, 20))]
+        + [("multi_electrode_waveform", bench_multi_electrode_waveform, p) for p in
+           grid_params(samples=samples, electrodes=(2, 8))]
+        + [("tiled_waveform", bench_tiled_waveform, p) for p in
+           grid_params(samples=samples, electrodes=(2, 8), PRF=(40.0, 33.0))]
+        + [("gen_interference_signal", bench_gen_interference_signal, p) for p in
+           grid_params(samples=samples, electrodes=(2, 8))]
+        + [("heating", bench_heating, {"pairs": 3})]
+    )
+
+
+# ----------------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------------
+def measure(setup, params, repeat=5):
+    '''Best time per call (s), calls per repeat, and the peak traced allocation (bytes).'''
+    fn = setup(**params)
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # calls per repeat for >= 0.2 s
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, number, peak
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def plain(v):
+    return np.dtype(v).name if isinstance(v, type) else v
+
+
+def case_id(name, params):
+    return name + "[" + ",".join(f"{k}={plain(v)}" for k, v in params.items()) + "]"
+
+
+def run(quick=False, pattern=None, repeat=5):
+    results = []
+    for name, setup, params in cases(quick):
+        cid = case_id(name, params)
+        if pattern and pattern not in cid:
+            continue
+        best, number, peak = measure(setup, params, repeat)
+        results.append({"id": cid, "name": name,
+                        "params": {k: plain(v) for k, v in params.items()},
+                        "time_s": best, "number": number, "peak_bytes": peak})
+        print(f"{cid:<70} {best * 1e3:10.3f} ms {peak / 2**20:9.2f} MiB", flush=True)
+    return {"commit": git_commit(), "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "numpy": np.__version__,
+            "machine": platform.machine(), "processor": platform.processor(),
+            "results": results}
+
+
+def compare(old_path, new_path):
+    '''Print new / old time and memory ratios of the cases present in both runs.'''
+    with open(old_path) as f:
+        old = {r["id"]: r for r in json.load(f)["results"]}
+    with open(new_path) as f:
+        new = {r["id"]: r for r in json.load(f)["results"]}
+    for cid in (c for c in new if c in old):
+        t = new[cid]["time_s"] / old[cid]["time_s"]
+        m = new[cid]["peak_bytes"] / max(old[cid]["peak_bytes"], 1)
+        flag = "  <-- slower" if t > 1.1 else ""
+        print(f"{cid:<70} time x{t:6.2f}  memory x{m:6.2f}{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", help="output JSON (default bench_<commit>.json)")
+    parser.add_argument("--quick", action="store_true", help="small sizes only")
+    parser.add_argument("-k", dest="pattern", help="only cases whose id contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+    else:
+        report = run(args.quick, args.pattern, args.repeat)
+        out = args.out or f"bench_{report['commit']}.json"
+        with open(out, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"wrote {out}")
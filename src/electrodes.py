@@ -0,0 +1,412 @@
+import numpy as np
+
+from cache import LRUCache
+from fields import R_MIN, V_magnitude, distance, sigma_abs
+
+
+# ----------------------------------------------------------------------------
+# Electrode Pair Object
+# ----------------------------------------------------------------------------
+class ElectrodePair:
+    def __init__(self, angle_deg, color_e1, color_e2,
+                 weight=1.0, steer=0.0, f1=20e3, f2=22e3, Rn=3e-3, label_e1="E1", label_e2="E2"):
+
+        self.angle = np.deg2rad(angle_deg)
+        self.color_e1 = color_e1
+        self.color_e2 = color_e2
+        self.label_e1 = label_e1
+        self.label_e2 = label_e2
+        self.weight = weight
+        self.steer = steer
+
+        self.w1 = 2 * np.pi * f1
+        self.w2 = 2 * np.pi * f2
+        self.Rn = Rn
+
+    def currents(self, total_I):
+        I_total = total_I * self.weight
+        α = (self.steer + 1) / 2
+        return α * I_total, (1 - α) * I_total
+
+    def positions(self):
+        θ = self.angle
+        e1 = np.array([self.Rn * np.cos(θ),         self.Rn * np.sin(θ)])
+        e2 = np.array([self.Rn * np.cos(θ + np.pi), self.Rn * np.sin(θ + np.pi)])
+        return e1, e2
+
+
+# ----------------------------------------------------------------------------
+# Electrode array engine
+# ----------------------------------------------------------------------------
+class ElectrodeArray:
+    '''Any number of electrodes (point or arc contacts), evaluated as one (E, points) tensor.
+
+    Electrodes in the same channel are driven by one source at one
+    frequency, so their (signed) currents superpose into a single carrier
+    field. This covers monopolar, bipolar and multipolar groupings. pairs
+    lists the channels whose carriers interfere; the AM envelope is
+    2 * sum over pairs of min(|V_a|, |V_b|).
+    -----
+    Parameters:
+    positions : np.ndarray
+        (E, 2) electrode coordinates in meters (m).
+    currents : np.ndarray
+        (E,) signed electrode currents in amperes (A).
+    frequencies : np.ndarray
+        (E,) carrier frequency of each electrode in Hz.
+    channels : np.ndarray, optional
+        (E,) channel label of each electrode. Defaults to one channel per electrode.
+    pairs : np.ndarray, optional
+        (G, 2) interfering channel indices. Defaults to (0, 1), (2, 3), ...
+    arc : float, optional
+        Angular length (rad) of finite arc contacts centred on each position,
+        along the circle through it. None treats contacts as point sources.
+    n_nodes : int
+        Gauss-Legendre nodes per arc contact.
+    '''
+
+    def __init__(self, positions, currents, frequencies, channels=None, pairs=None,
+                 arc=None, n_nodes=16):
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        self.arc = arc
+        self.n_nodes = n_nodes
+        E = len(self.positions)
+        self.currents = np.broadcast_to(np.asarray(currents, dtype=float), (E,)).copy()
+        self.frequencies = np.broadcast_to(np.asarray(frequencies, dtype=float), (E,)).copy()
+
+        if channels is None:
+            channels = np.arange(E)
+        self.channels = np.asarray(channels, dtype=int)
+        K = self.channels.max() + 1 if E else 0
+        if pairs is None:
+            pairs = np.arange(K - K % 2).reshape(-1, 2)
+        self.pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+
+        channel_f = np.full(K, np.nan)
+        channel_f[self.channels] = self.frequencies
+        if not np.allclose(channel_f[self.channels], self.frequencies):
+            raise ValueError("electrodes in one channel must share a frequency")
+
+        # (K, E) signed current matrix; diagonal in the usual one-electrode-per-channel case
+        self.simple = K == E and np.array_equal(self.channels, np.arange(E))
+        self.mixing = np.zeros((K, E))
+        self.mixing[self.channels, np.arange(E)] = self.currents
+
+    def __len__(self):
+        return len(self.positions)
+
+    @classmethod
+    def from_pairs(cls, pairs, total_I, arc=None):
+        '''Two opposed, separately driven electrodes per ElectrodePair, in pair order.'''
+        angles = np.array([p.angle for p in pairs])
+        Rn = np.array([p.Rn for p in pairs])
+        I = np.array([p.currents(total_I) for p in pairs]).reshape(-1, 2)
+        w = np.array([(p.w1, p.w2) for p in pairs]).reshape(-1, 2)
+        return cls.opposed_pairs(angles, I[:, 0], I[:, 1], w[:, 0] / (2 * np.pi),
+                                 w[:, 1] / (2 * np.pi), Rn, arc=arc)
+
+    @classmethod
+    def opposed_pairs(cls, angles, I1, I2, f1, f2, Rn, arc=None):
+        '''Pairs of diametrically opposed electrodes on the cuff (angles in rad).'''
+        angles = np.atleast_1d(angles)
+        θ = np.stack([angles, angles + np.pi], axis=1).ravel()
+        Rn = np.repeat(np.broadcast_to(Rn, angles.shape), 2)
+        positions = np.stack([Rn * np.cos(θ), Rn * np.sin(θ)], axis=1)
+        currents = np.stack(np.broadcast_arrays(I1, I2, angles)[:2], axis=1).ravel()
+        freqs = np.stack(np.broadcast_arrays(f1, f2, angles)[:2], axis=1).ravel()
+        return cls(positions, currents, freqs, arc=arc)
+
+    @classmethod
+    def ring(cls, n, Rn, currents, frequencies, channels=None, pairs=None, offset=0.0,
+             arc=None):
+        '''n contacts evenly spaced on the cuff circle, e.g. the 16-site Microfab cuff.'''
+        θ = offset + 2 * np.pi * np.arange(n) / n
+        positions = np.stack([Rn * np.cos(θ), Rn * np.sin(θ)], axis=1)
+        return cls(positions, currents, frequencies, channels, pairs, arc=arc)
+
+    def arc_nodes(self):
+        '''(E, Q, 2) Gauss-Legendre nodes along each arc contact and their (Q,) weights (sum 1).'''
+        ξ, w = np.polynomial.legendre.leggauss(self.n_nodes)
+        ρ = np.hypot(self.positions[:, 0], self.positions[:, 1])
+        φ = np.arctan2(self.positions[:, 1], self.positions[:, 0])
+        θ = φ[:, None] + 0.5 * self.arc * ξ[None, :]
+        nodes = np.stack([ρ[:, None] * np.cos(θ), ρ[:, None] * np.sin(θ)], axis=-1)
+        return nodes, w / 2
+
+    def kernel(self, X, Y, dtype=np.float64, polar=None):
+        '''(E, points) geometric part of the unit fields: 1/r, or its arc average.
+
+        Arc kernels come from an ArcKernelTable per contact radius (built once,
+        then shared by every contact angle): the contacts on one radius are
+        looked up together as a single gather, and their points next to the
+        contact evaluated together by direct quadrature. The loop is over
+        distinct radii only, one for a cuff. polar = (r, phi) of the points,
+        e.g. NerveGrid.polar, saves recomputing them.
+        '''
+        X = np.asarray(X).ravel()
+        Y = np.asarray(Y).ravel()
+        if self.arc is None:
+            K = distance(X[None, :], Y[None, :], self.positions.T[:, :, None], dtype)
+            np.maximum(K, R_MIN, out=K)
+            return np.reciprocal(K, out=K)
+
+        r, φ = (np.hypot(X, Y), np.arctan2(Y, X)) if polar is None else polar
+        ρ = np.round(np.hypot(self.positions[:, 0], self.positions[:, 1]), 15)
+        θ = np.arctan2(self.positions[:, 1], self.positions[:, 0])
+        K = np.empty((len(self), X.size), dtype=dtype)
+        # One table, and one batched lookup, per contact radius (a cuff has one)
+        for rho in np.unique(ρ):
+            group = np.flatnonzero(ρ == rho)
+            table = arc_table(rho, self.arc, self.n_nodes, np.max(r, initial=0), dtype)
+            if table is None:
+                K[group] = self.arc_kernel(X, Y, dtype, electrodes=group)
+                continue
+            K[group], (e, p) = table.lookup(r, φ, θ[group])
+            if p.size:
+                K[group[e], p] = self.arc_kernel_at(group[e], X[p], Y[p], dtype)
+        return K
+
+    def arc_kernel(self, X, Y, dtype=np.float64, electrodes=None):
+        '''(E, points) arc-averaged 1/r by direct Gauss-Legendre quadrature.'''
+        # Current spread evenly over the arc: average 1/r over quadrature nodes,
+        # as one (E, Q, points) tensor. Each node stands for a segment of the
+        # arc, so distances are clamped to half the node spacing rather than
+        # R_MIN; that keeps pixels next to a node from becoming hot spots.
+        nodes, w = self.arc_nodes()
+        ρ = np.hypot(self.positions[:, 0], self.positions[:, 1])
+        if electrodes is not None:
+            nodes, ρ = nodes[electrodes], ρ[electrodes]
+        R = distance(X, Y, (nodes[..., 0, None], nodes[..., 1, None]), dtype)
+        r_min = np.maximum(self.arc * ρ / (2 * self.n_nodes), R_MIN)
+        np.maximum(R, r_min.astype(dtype)[:, None, None], out=R)
+        np.reciprocal(R, out=R)
+        return np.einsum("q,eqp->ep", w.astype(dtype), R)
+
+    def arc_kernel_at(self, electrodes, X, Y, dtype=np.float64):
+        '''(points,) arc-averaged 1/r of electrodes[i] at point i, by direct quadrature.'''
+        nodes, w = self.arc_nodes()
+        nodes = nodes[electrodes]  # (points, Q, 2)
+        ρ = np.hypot(self.positions[electrodes, 0], self.positions[electrodes, 1])
+        R = distance(X[:, None], Y[:, None], (nodes[..., 0], nodes[..., 1]), dtype)
+        r_min = np.maximum(self.arc * ρ / (2 * self.n_nodes), R_MIN)
+        np.maximum(R, r_min.astype(dtype)[:, None], out=R)
+        np.reciprocal(R, out=R)
+        return R @ w.astype(dtype)
+
+    def unit_fields(self, X, Y, sigma_dc, eps_r, dtype=np.float64, polar=None):
+        '''(E, points) unit-current |V| of every electrode at its own frequency.'''
+        omega = 2 * np.pi * self.frequencies[:, None]
+        if self.arc is None:
+            # Point sources: the shared |V| kernel, written into the distance buffer
+            R = distance(np.ravel(X)[None, :], np.ravel(Y)[None, :],
+                         self.positions.T[:, :, None], dtype)
+            return V_magnitude(1.0, R, omega, sigma_dc, eps_r, dtype, out=R)
+        U = self.kernel(X, Y, dtype, polar)
+        U *= (1 / (4 * np.pi * sigma_abs(omega, sigma_dc, eps_r))).astype(dtype)
+        return U
+
+    def potentials(self, U):
+        '''(K, points) signed carrier potential of every channel from real unit fields U.'''
+        if self.simple:
+            return self.currents.astype(U.dtype)[:, None] * U
+        return self.mixing.astype(U.dtype) @ U
+
+    def carriers(self, U):
+        '''(K, points) carrier amplitude of every channel from unit fields U (real or complex).'''
+        if self.simple:
+            A = np.abs(U) if np.iscomplexobj(U) else U
+            return np.abs(self.currents).astype(A.dtype)[:, None] * A
+        return np.abs(self.mixing.astype(U.dtype) @ U)
+
+    def am(self, U):
+        '''Un-normalized AM envelope (points,) from unit fields U.'''
+        A = self.carriers(U)
+        return 2 * np.minimum(A[self.pairs[:, 0]], A[self.pairs[:, 1]]).sum(axis=0)
+
+    def am_sweep(self, X, Y, carrier_pairs, sigma_dc, eps_r, dtype=np.float64):
+        '''Un-normalized AM envelope (F, points) for F carrier-frequency pairs in one pass.
+
+        The electrodes of a channel share a frequency, so a channel's carrier
+        is its frequency-free kernel carrier times 1 / (4 pi |sigma*(f)|).
+        Distances are computed once; only that scalar changes per frequency.
+        The array's own frequencies are ignored.
+        -----
+        Parameters:
+        X, Y : np.ndarray
+            Evaluation points in meters (m).
+        carrier_pairs : np.ndarray
+            (F, 2) carrier frequencies (f1, f2) in Hz applied to every
+            interfering pair, or (F, G, 2) for one (f1, f2) per pair.
+        sigma_dc, eps_r : float
+            Tissue parameters.
+        dtype : np.dtype
+            Working dtype.
+        -------
+        Returns:
+        np.ndarray
+            (F, points) AM envelope in volts.
+        '''
+
+        carrier_pairs = np.asarray(carrier_pairs, dtype=float)
+        F = carrier_pairs.shape[0]
+        f = np.broadcast_to(carrier_pairs.reshape(F, -1, 2), (F, len(self.pairs), 2))
+        scale = (1 / (4 * np.pi * sigma_abs(2 * np.pi * f, sigma_dc, eps_r))).astype(dtype)
+
+        C = self.carriers(self.kernel(X, Y, dtype))
+        A1 = scale[..., 0, None] * C[self.pairs[:, 0]]  # (F, G, points)
+        A2 = scale[..., 1, None] * C[self.pairs[:, 1]]
+        return 2 * np.minimum(A1, A2, out=A1).sum(axis=1)
+
+
+# ----------------------------------------------------------------------------
+# Tabulated arc-contact kernel
+# ----------------------------------------------------------------------------
+class ArcKernelTable:
+    '''Arc-averaged 1/r of one contact, tabulated once over (r, |dphi|).
+
+    A contact of angular length arc on the circle of radius rho sees a
+    point only through its radius r and its angle dphi from the contact
+    centre (and the kernel is even in dphi), so one table serves every
+    contact angle: a new angle costs a bilinear lookup per point instead of
+    n_nodes distances. Next to the contact, where the quadrature ripples
+    between nodes and interpolation is poor, lookup() returns the points to
+    evaluate directly instead. Lookups stay within ~5e-5 of the direct
+    quadrature.
+
+    The table step is the contact length over STEPS_PER_ARC, so the table
+    grows as 1 / arc^2; for short contacts the step is coarsened to keep
+    the table under MAX_BYTES, and the directly evaluated box grows with
+    it (NEAR_STEPS steps), which keeps the relative error unchanged.
+    -----
+    Parameters:
+    rho : float
+        Contact radius in meters (m).
+    arc : float
+        Angular length of the contact (rad).
+    n_nodes : int
+        Gauss-Legendre nodes of the direct quadrature.
+    r_max : float
+        Largest point radius covered (m).
+    dtype : np.dtype
+        Table dtype.
+    '''
+
+    STEPS_PER_ARC = 128  # finest table step is the contact length over this
+    NEAR_STEPS = 64  # points within this many table steps of the contact are evaluated directly
+    MAX_BYTES = 32 * 2**20  # table size cap; small contacts get a coarser step instead
+    BLOCK = 2**14  # (contact, point) pairs per lookup block
+
+    @classmethod
+    def step(cls, rho, arc, r_max, dtype=np.float64) -> float:
+        '''Table step: the contact length over STEPS_PER_ARC, coarsened to fit MAX_BYTES.'''
+        # (r_max / dr) * (pi rho / dr) cells of 4 coefficients each
+        cells = cls.MAX_BYTES / (4 * np.dtype(dtype).itemsize)
+        return max(arc * rho / cls.STEPS_PER_ARC, 1.05 * np.sqrt(np.pi * rho * r_max / cells))
+
+    @classmethod
+    def size(cls, rho, arc, r_max, dtype=np.float64) -> tuple:
+        '''(step, n_r, n_phi, nbytes) of the table for these parameters.'''
+        dr = cls.step(rho, arc, r_max, dtype)
+        n_r = int(np.ceil(r_max / dr)) + 2
+        n_phi = int(np.ceil(np.pi * rho / dr)) + 2
+        return dr, n_r, n_phi, (n_r - 1) * (n_phi - 1) * 4 * np.dtype(dtype).itemsize
+
+    def __init__(self, rho, arc, n_nodes, r_max, dtype=np.float64):
+        self.dr, self.n_r, self.n_phi, _ = self.size(rho, arc, r_max, dtype)
+        self.dphi = np.pi / (self.n_phi - 1)
+        self.r_max = (self.n_r - 1) * self.dr
+        r = self.dr * np.arange(self.n_r)
+        cosΦ = np.cos(self.dphi * np.arange(self.n_phi))
+        sinΦ = np.sin(self.dphi * np.arange(self.n_phi))
+        contact = ElectrodeArray([rho, 0.0], 1.0, 0.0, arc=arc, n_nodes=n_nodes)
+        # Tabulated in row blocks, so the (n_nodes, points) quadrature stays small
+        T = np.empty((self.n_r, self.n_phi), dtype=dtype)
+        block = max(1, 2**16 // self.n_phi)
+        for i in range(0, self.n_r, block):
+            R = r[i:i + block, None]
+            T[i:i + block] = contact.arc_kernel((R * cosΦ).ravel(), (R * sinΦ).ravel(),
+                                                dtype)[0].reshape(len(R), self.n_phi)
+        # Bilinear coefficients of every cell, one row per cell, so that a
+        # lookup is a single row gather: c0 + c1 t + fr (c2 + c3 t)
+        T00, T01, T10, T11 = T[:-1, :-1], T[:-1, 1:], T[1:, :-1], T[1:, 1:]
+        self.table = np.stack([T00, T01 - T00, T10 - T00, T11 - T10 - T01 + T00],
+                              axis=-1).reshape(-1, 4)
+        self.table.setflags(write=False)
+        self.nbytes = self.table.nbytes
+        # Box around the contact (in r and |dphi|) evaluated directly; at the
+        # finest step it reaches half a contact length from the contact
+        reach = self.NEAR_STEPS * self.dr
+        self.near_r = rho - reach
+        self.near_phi = (arc / 2 + reach / rho) / self.dphi
+        self._radial = None
+
+    def radial(self, r):
+        '''Row offsets, row fractions and near-radius mask of points at radii r.
+
+        The same r (e.g. NerveGrid.polar) is looked up at every new contact
+        angle, so the last result is kept and reused while r is the same array.
+        '''
+        cached = self._radial  # read once: another thread may replace it
+        if cached is not None and cached[0] is r:
+            return cached[1:]
+        fr = r / self.dr
+        i = np.minimum(fr.astype(np.intp), self.n_r - 2)
+        fr -= i
+        radial = (i * (self.n_phi - 1), fr, r > self.near_r)
+        self._radial = (r,) + radial
+        return radial
+
+    def lookup(self, r, phi, theta):
+        '''Kernels of contacts centred at angles theta, (G, points), at points (r, phi).
+
+        All contacts are looked up together, one row gather per block of
+        points (blocks keep the (G, block, 4) coefficients in cache). Also
+        returns the (contact, point) index pairs to evaluate directly.
+        '''
+        base, fr, outer = self.radial(r)
+        theta = np.mod(theta, 2 * np.pi)[:, None] / self.dphi
+        n = self.n_phi - 1  # table index of |dphi| = pi
+        K = np.empty((len(theta), len(r)), dtype=self.table.dtype)
+        near = np.empty(K.shape, dtype=bool)
+        step = max(self.BLOCK // len(theta), 1)
+        for start in range(0, len(r), step):
+            b = slice(start, start + step)
+            t = phi[b] * (1 / self.dphi) - theta  # in [-3n, n]
+            t += 2 * n * (t < -n)
+            np.abs(t, out=t)
+            np.less(t, self.near_phi, out=near[:, b])
+            j = np.minimum(t.astype(np.intp), n - 1)
+            t -= j
+            j += base[b]
+            c = self.table.take(j, axis=0)
+            k = K[:, b]
+            np.multiply(c[..., 3], t, out=k)
+            k += c[..., 2]
+            k *= fr[b]
+            t *= c[..., 1]
+            k += t
+            k += c[..., 0]
+        near &= outer
+        return K, np.nonzero(near)
+
+
+_ARC_TABLES = LRUCache(128 * 2**20)
+
+
+def arc_table(rho, arc, n_nodes, r_max, dtype=np.float64):
+    '''Cached ArcKernelTable covering radii up to r_max (rounded up to a quarter of rho).
+
+    Returns None when the table would not fit in the table cache, so that
+    callers evaluate the quadrature directly instead of rebuilding a table
+    on every call.
+    '''
+    rho = float(np.round(rho, 15))
+    r_max = rho * max(1.0, np.ceil(4 * r_max / rho) / 4)
+    if ArcKernelTable.size(rho, arc, r_max, dtype)[3] > _ARC_TABLES.max_bytes:
+        return None
+    key = (rho, float(arc), int(n_nodes), float(r_max), np.dtype(dtype).str)
+    table = _ARC_TABLES.get(key)
+    if table is None:
+        table = ArcKernelTable(rho, arc, n_nodes, r_max, dtype)
+        _ARC_TABLES.put(key, table, table.nbytes)
+    return table
@@ -0,0 +1,181 @@
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
+
+from cache import LRUCache
+from fields import eps0, sigma_star
+
+
+class FDSolver:
+    '''2-D finite-volume solver for the potential in a heterogeneous nerve cross-section.
+
+    Unknowns are the interior pixels of a NerveGrid, each with its own
+    complex conductivity sigma + j omega eps0 eps_r. The sparse system is factorized
+    once per frequency, cached, and reused for every electrode right-hand
+    side, so moving electrodes only costs triangular solves. Solved lead
+    fields are also cached per (contact pixels, frequency), so only moved
+    electrodes are solved again.
+
+    The cuff is insulating: no current crosses the nerve boundary. Current
+    leaves the cross-section along the nerve instead, through the open
+    ends of a cuff of length cuff_length. With a potential vanishing at
+    the cuff ends (V ~ cos(pi z / cuff_length)), this adds a leak
+    sigma* (pi / cuff_length)^2 per unit area of every pixel. Monopolar
+    channels (one electrode each, as ElectrodePair builds them) therefore
+    have a return that does not single out any point of the cross-section.
+    Optionally, returns grounds a set of pixels (a return contact), and
+    ground_radius removes the cuff, leaking every boundary face into an
+    annulus of background tissue grounded at that radius. Potentials are
+    per unit length of nerve (2-D), so compare them after normalization.
+    -----
+    Parameters:
+    grid : NerveGrid
+        Cross-section grid.
+    sigma_dc, eps_r : float
+        Tissue parameters of every pixel without a label (or with label 0).
+        sigma_dc may be a dispersive tissues.Tissue instead.
+    labels : np.ndarray, optional
+        (points,) integer tissue label of each interior pixel.
+    tissues : dict, optional
+        label -> (sigma_dc, eps_r), or label -> callable(omega) giving sigma*.
+    cuff_length : float or None
+        Cuff length in meters (m); None removes the leak along the nerve.
+    returns : np.ndarray, optional
+        Indices (or a (points,) boolean mask) of pixels held at 0 V.
+    ground_radius : float, optional
+        Radius in meters (m) of a grounded return around an uninsulated
+        nerve. None (default) keeps the boundary insulating.
+    max_factorizations : int
+        Number of frequencies whose factorization is kept.
+    cache_bytes : int
+        Memory budget of the lead-field cache.
+    '''
+
+    def __init__(self, grid, sigma_dc=0.3, eps_r=5000, labels=None, tissues=None,
+                 cuff_length=5e-3, returns=None, ground_radius=None, max_factorizations=4,
+                 cache_bytes=128 * 2**20):
+        self.grid = grid
+        self.sigma_dc = sigma_dc
+        self.eps_r = eps_r
+        self.labels = np.zeros(len(grid), dtype=int) if labels is None else np.asarray(labels)
+        self.tissues = {} if tissues is None else dict(tissues)
+        self.cuff_length = cuff_length
+        self.ground_radius = ground_radius
+        if ground_radius is not None and ground_radius <= grid.Rn:
+            raise ValueError("ground_radius must be larger than the nerve radius")
+        grounded = np.zeros(len(grid), dtype=bool)
+        if returns is not None:
+            grounded[returns] = True
+        if cuff_length is None and ground_radius is None and not grounded.any():
+            raise ValueError("an insulated cuff needs cuff_length, returns or ground_radius "
+                             "for current to return")
+        self.free = np.flatnonzero(~grounded)
+        self.max_factorizations = max_factorizations
+        self._lu = OrderedDict()
+        self._fields = LRUCache(cache_bytes)
+        self._tree = cKDTree(np.column_stack([grid.xs, grid.ys]))
+
+        # Faces between horizontally / vertically adjacent interior pixels
+        lookup = np.full(grid.N * grid.N, -1)
+        lookup[grid.index] = np.arange(len(grid))
+        last = grid.N * grid.N - 1
+        right = np.where(grid.cols < grid.N - 1, lookup[np.minimum(grid.index + 1, last)], -1)
+        up = np.where(grid.rows < grid.N - 1, lookup[np.minimum(grid.index + grid.N, last)], -1)
+        a = np.arange(len(grid))
+        self.faces = np.concatenate([
+            np.stack([a[right >= 0], right[right >= 0]], axis=1),
+            np.stack([a[up >= 0], up[up >= 0]], axis=1),
+        ])
+        # Boundary faces (to a missing neighbour), insulated unless ground_radius is set
+        self.open_faces = 4 - np.bincount(self.faces.ravel(), minlength=len(grid))
+
+    def conductivity(self, omega) -> np.ndarray:
+        '''(points,) complex conductivity of every interior pixel.'''
+        sig = np.full(len(self.grid), sigma_star(omega, self.sigma_dc, self.eps_r), dtype=complex)
+        for label, tissue in self.tissues.items():
+            value = tissue(omega) if callable(tissue) else tissue[0] + 1j * omega * eps0 * tissue[1]
+            sig[self.labels == label] = value
+        return sig
+
+    def factorization(self, omega):
+        '''Sparse LU of the system at omega (on the free pixels), cached per frequency.'''
+        key = float(omega)
+        if key in self._lu:
+            self._lu.move_to_end(key)
+            return self._lu[key]
+
+        sig = self.conductivity(omega)
+        p, q = self.faces.T
+        g = 2 * sig[p] * sig[q] / (sig[p] + sig[q])  # harmonic mean across the face
+        P = len(self.grid)
+        leak = np.zeros(P, dtype=complex)
+        if self.cuff_length is not None:
+            # Out through the cuff ends, per pixel area h^2
+            h = self.grid.x[1] - self.grid.x[0]
+            leak += sig * (np.pi * h / self.cuff_length) ** 2
+        if self.ground_radius is not None:
+            # Surrounding annulus to ground, shared over the boundary faces
+            leak += (2 * np.pi * sigma_star(omega, self.sigma_dc, self.eps_r)
+                     / np.log(self.ground_radius / self.grid.Rn)
+                     / self.open_faces.sum()) * self.open_faces
+        a = np.arange(P)
+        A = sp.coo_matrix(
+            (np.concatenate([g, g, -g, -g, leak]),
+             (np.concatenate([p, q, p, q, a]), np.concatenate([p, q, q, p, a]))),
+            shape=(P, P),
+        ).tocsc()
+        # Grounded pixels are eliminated (their potential is 0)
+        lu = splu(A[self.free][:, self.free].tocsc())
+
+        self._lu[key] = lu
+        while len(self._lu) > self.max_factorizations:
+            self._lu.popitem(last=False)
+        return lu
+
+    def contacts(self, array):
+        '''(E, Q) pixels injecting each electrode's current and their (E, Q) weights.'''
+        if array.arc is None:
+            _, pix = self._tree.query(array.positions)
+            return pix[:, None], np.ones((len(array), 1))
+        nodes, w = array.arc_nodes()
+        _, pix = self._tree.query(nodes.reshape(-1, 2))
+        pix = pix.reshape(len(array), -1)
+        return pix, np.broadcast_to(w, pix.shape)
+
+    def lead_fields(self, array, dtype=np.complex128) -> np.ndarray:
+        '''(E, points) complex potential of every electrode for unit current at its own frequency.'''
+        P = len(self.grid)
+        pix, weight = self.contacts(array)
+        keys = [(float(f), pix[e].tobytes(), weight[e].tobytes())
+                for e, f in enumerate(array.frequencies)]
+        V = np.empty((len(array), P), dtype=dtype)
+        missing = []
+        for e, key in enumerate(keys):
+            cached = self._fields.get(key)
+            if cached is None:
+                missing.append(e)
+            else:
+                V[e] = cached
+
+        for f in np.unique(array.frequencies[missing]):
+            e = np.array([m for m in missing if array.frequencies[m] == f])
+            B = np.zeros((P, len(e)), dtype=complex)
+            np.add.at(B, (pix[e], np.broadcast_to(np.arange(len(e))[:, None], pix[e].shape)),
+                      weight[e])
+            sol = np.zeros((len(e), P), dtype=complex)
+            sol[:, self.free] = self.factorization(2 * np.pi * f).solve(
+                np.ascontiguousarray(B[self.free])).T
+            for k, m in enumerate(e):
+                field = sol[k].astype(dtype)
+                field.setflags(write=False)
+                self._fields.put(keys[m], field)
+                V[m] = field
+        return V
+
+    def unit_fields(self, array, dtype=np.float64) -> np.ndarray:
+        '''Unit fields in the form ElectrodeArray.am expects (complex, so channels superpose).'''
+        complex_dtype = np.result_type(dtype, np.complex64)
+        return self.lead_fields(array, complex_dtype)
@@ -0,0 +1,213 @@
+from functools import cached_property
+
+import numpy as np
+
+eps0 = 8.854e-12
+R_MIN = 1e-6  # m, distances are clamped to this to avoid the point-source singularity
+SOLVER_VERSION = 1  # bump when the point-source kernel changes (invalidates stored lead fields)
+
+
+# ----------------------------------------------------------------------------
+# Point-source physics (infinite homogeneous tissue)
+# ----------------------------------------------------------------------------
+# sigma_dc may also be a dispersive tissue, a callable omega -> sigma* (see tissues.Tissue);
+# eps_r is then unused.
+def sigma_star(omega, sigma_dc, eps_r):
+    if callable(sigma_dc):
+        return sigma_dc(omega)
+    return sigma_dc + 1j * omega * eps0 * eps_r
+
+
+def V_point(I, r, omega, sigma_dc, eps_r):
+    '''Complex potential of a point current source I at distance r.'''
+    sig = sigma_star(omega, sigma_dc, eps_r)
+    return I / (4 * np.pi * sig * np.maximum(r, R_MIN))
+
+
+def sigma_abs(omega, sigma_dc, eps_r):
+    '''|sigma*| without going through complex numbers.'''
+    if callable(sigma_dc):
+        return np.abs(sigma_dc(omega))
+    return np.hypot(sigma_dc, omega * eps0 * eps_r)
+
+
+def tissue_key(sigma_dc, eps_r):
+    '''Hashable (and JSON-friendly) description of the tissue parameters, for cache keys.'''
+    if callable(sigma_dc):
+        return sigma_dc.key
+    return float(sigma_dc), float(eps_r)
+
+
+def V_magnitude(I, r, omega, sigma_dc, eps_r, dtype=np.float64, out=None):
+    '''Magnitude of V_point, computed in closed form as |I| / (4 pi |sigma*| r).
+    -----
+    Parameters:
+    I : float
+        Source current in amperes (A).
+    r : np.ndarray
+        Distances to the source in meters (m).
+    omega : float
+        Angular frequency in rad/s.
+    sigma_dc : float
+        DC conductivity in S/m.
+    eps_r : float
+        Relative permittivity.
+    dtype : np.dtype
+        Output dtype (np.float32 halves memory again versus float64).
+    out : np.ndarray, optional
+        Buffer to write into. May be r itself.
+    -------
+    Returns:
+    np.ndarray
+        |V| in volts, same shape as r.
+    '''
+
+    if out is None:
+        out = np.empty(np.shape(r), dtype=dtype)
+    scale = np.abs(I) / (4 * np.pi * sigma_abs(omega, sigma_dc, eps_r))
+    np.maximum(r, R_MIN, out=out)
+    np.divide(scale, out, out=out)
+    return out
+
+
+def distance(X, Y, pos, dtype=np.float64, out=None):
+    '''Euclidean distance from every (X, Y) point to pos = (x, y) (broadcasting).'''
+    if out is None:
+        out = np.empty(np.broadcast_shapes(np.shape(X), np.shape(pos[0])), dtype=dtype)
+    dy = np.subtract(Y, pos[1], dtype=out.dtype)
+    np.subtract(X, pos[0], out=out)
+    return np.hypot(out, dy, out=out)
+
+
+# ----------------------------------------------------------------------------
+# Packed nerve grid
+# ----------------------------------------------------------------------------
+class NerveGrid:
+    '''N x N grid over [-Rn, Rn]^2 with only the nerve interior kept as 1-D arrays.
+
+    Physics is evaluated on the packed interior points (xs, ys); scatter()
+    puts packed values back into an (N, N) image for display.
+    -----
+    Parameters:
+    Rn : float
+        Nerve radius in meters (m).
+    N : int
+        Number of grid points per side.
+    '''
+
+    def __init__(self, Rn: float, N: int):
+        self.Rn = Rn
+        self.N = N
+        self.x = np.linspace(-Rn, Rn, N)
+        self.y = np.linspace(-Rn, Rn, N)
+
+    # Full-grid arrays are built on first use, so tiled evaluation of very
+    # large grids (see evaluate_tiled) never allocates them.
+    @cached_property
+    def mask(self):
+        X, Y = self.meshgrid()
+        return (X**2 + Y**2) > self.Rn**2  # outside the nerve
+
+    @cached_property
+    def index(self):
+        return np.flatnonzero(~self.mask)
+
+    @cached_property
+    def rows(self):
+        return self.index // self.N
+
+    @cached_property
+    def cols(self):
+        return self.index % self.N
+
+    @cached_property
+    def xs(self):
+        return np.tile(self.x, self.N)[self.index]
+
+    @cached_property
+    def ys(self):
+        return np.repeat(self.y, self.N)[self.index]
+
+    @cached_property
+    def polar(self):
+        '''(r, phi) of the packed interior points, for kernels that only depend on those.'''
+        return np.hypot(self.xs, self.ys), np.arctan2(self.ys, self.xs)
+
+    def __len__(self):
+        return self.index.size
+
+    @property
+    def shape(self):
+        return (self.N, self.N)
+
+    def meshgrid(self):
+        return np.meshgrid(self.x, self.y)
+
+    def band(self, r0, r1):
+        '''Packed interior points of image rows r0:r1, and their (r1 - r0, N) mask.'''
+        X, Y = np.meshgrid(self.x, self.y[r0:r1])
+        inside = (X**2 + Y**2) <= self.Rn**2
+        return X[inside], Y[inside], inside
+
+    def scatter(self, values, fill=np.nan, out=None):
+        '''Place packed values (..., P) into an (..., N, N) image.
+
+        With out=, only the interior pixels of out are written, so a
+        persistent display buffer keeps its fill outside the nerve.
+        '''
+        values = np.asarray(values)
+        if out is None:
+            out = np.full(values.shape[:-1] + self.shape, fill, dtype=values.dtype)
+        out[..., self.rows, self.cols] = values
+        return out
+
+
+def evaluate_tiled(grid, evaluate, max_bytes, out=None, dtype=np.float64,
+                   normalize=False, bytes_per_point=64):
+    '''Evaluate a packed-point function over the grid in row blocks of bounded size.
+    -----
+    Parameters:
+    grid : NerveGrid
+        Grid to evaluate on. Its full-grid arrays are never touched.
+    evaluate : callable
+        evaluate(xs, ys) -> values for 1-D interior coordinates.
+    max_bytes : int
+        Memory ceiling for one block of work.
+    out : np.ndarray, optional
+        (N, N) output image, e.g. an np.memmap from np.lib.format.open_memmap.
+    dtype : np.dtype
+        dtype of the image allocated when out is not given.
+    normalize : bool
+        Divide the result by its maximum (a second pass over the blocks).
+    bytes_per_point : int
+        Working memory used by evaluate per point, sets the block height.
+    -------
+    Returns:
+    np.ndarray
+        (N, N) image, NaN outside the nerve. Identical to scattering the
+        dense result of evaluate(grid.xs, grid.ys).
+    '''
+
+    if out is None:
+        out = np.empty(grid.shape, dtype=dtype)
+    step = max(1, int(max_bytes // (bytes_per_point * grid.N)))
+    blocks = [(r0, min(r0 + step, grid.N)) for r0 in range(0, grid.N, step)]
+
+    maxima = []
+    for r0, r1 in blocks:
+        xs, ys, inside = grid.band(r0, r1)
+        block = out[r0:r1]
+        block[...] = np.nan
+        if xs.size:
+            values = evaluate(xs, ys)
+            block[inside] = values
+            maxima.append(np.max(values))
+
+    if normalize and maxima:
+        vmax = np.max(maxima)
+        for r0, r1 in blocks:
+            out[r0:r1] /= vmax
+
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
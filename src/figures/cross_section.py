@@ -1,3 +1,10 @@
+import copy
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Circle, Arc
@@ -6,113 +13,180 @@ from mpl_toolkits.axes_grid1.inset_locator import inset_axes
 from matplotlib.text import Text
 
 from scipy.ndimage import gaussian_filter
-from matplotlib.colors import LinearSegmentedColormap
-
-eps0 = 8.854e-12
-
-
-# ----------------------------------------------------------------------------
-# Physics
-# ----------------------------------------------------------------------------
-def sigma_star(omega, sigma_dc, eps_r):
-    return sigma_dc + 1j * omega * eps0 * eps_r
+from matplotlib.colors import LinearSegmentedColormap, Normalize
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-
-def V_point(I, r, omega, sigma_dc, eps_r):
-    sig = sigma_star(omega, sigma_dc, eps_r)
-    return I / (4 * np.pi * sig * np.maximum(r, 1e-6))
-
-
-# ----------------------------------------------------------------------------
-# Electrode Pair Object
-# ----------------------------------------------------------------------------
-class ElectrodePair:
-    def __init__(self, angle_deg, color_e1, color_e2,
-                 weight=1.0, steer=0.0, f1=20e3, f2=22e3, Rn=3e-3, label_e1="E1", label_e2="E2"):
-
-        self.angle = np.deg2rad(angle_deg)
-        self.color_e1 = color_e1
-        self.color_e2 = color_e2
-        self.label_e1 = label_e1
-        self.label_e2 = label_e2
-        self.weight = weight
-        self.steer = steer
-
-        self.w1 = 2 * np.pi * f1
-        self.w2 = 2 * np.pi * f2
-        self.Rn = Rn
-
-    def currents(self, total_I):
-        I_total = total_I * self.weight
-        α = (self.steer + 1) / 2
-        return α * I_total, (1 - α) * I_total
-
-    def positions(self):
-        θ = self.angle
-        e1 = np.array([self.Rn * np.cos(θ),         self.Rn * np.sin(θ)])
-        e2 = np.array([self.Rn * np.cos(θ + np.pi), self.Rn * np.sin(θ + np.pi)])
-        return e1, e2
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from electrodes import ElectrodeArray, ElectrodePair
+from envelope import envelope_map
+from fields import NerveGrid, evaluate_tiled
+from leadfield import LeadFieldCache, LeadFieldStore
+from polar import PolarGrid
 
 
 # ----------------------------------------------------------------------------
 # Fast field calculation (vectorized)
 # ----------------------------------------------------------------------------
-def compute_field(pairs, X, Y, mask, total_I, sigma_dc, eps_r):
-    AMs = []
-
-    for p in pairs:
-        e1, e2 = p.positions()
-        I1, I2 = p.currents(total_I)
+def compute_field(pairs, grid, total_I, sigma_dc, eps_r, cache=None,
+                  dtype=np.float64, max_bytes=None, out=None, polar=None, arc=None,
+                  solver=None, vector=None, normalize=True):
+    """Normalized AM of all pairs on the packed interior points of grid.
+
+    The pairs are evaluated together as one ElectrodeArray. With a
+    LeadFieldCache, each electrode's unit-current map comes from the cache
+    (or its on-disk store), so only moved electrodes need new distances.
+    Use grid.scatter() to get an image back.
+
+    With max_bytes set, the grid is evaluated in row blocks under that
+    memory ceiling instead, and the (N, N) image is returned (written into
+    out, which may be an np.memmap). The cache is not used in that mode.
+
+    With a PolarGrid, the AM is computed on the polar grid from rolled
+    per-carrier unit fields and only resampled onto grid for display.
+
+    arc (rad) models each contact as a finite arc instead of a point source.
+
+    With an FDSolver, the unit fields come from its heterogeneous-tissue
+    finite-volume solution instead of the point-source formula.
+
+    vector switches from the scalar potential envelope to the E-field
+    envelope: "max" gives the maximal modulation depth over all fiber
+    orientations, a float the depth along that fiber orientation (rad).
+
+    normalize=False returns the raw AM (V, or V/m with vector), which is a
+    sum over pairs, so per-pair results can be added up.
+
+    vector, polar, max_bytes and solver are separate evaluation paths, so at
+    most one of them may be given, and cache only applies to the default
+    point-source path; other combinations raise ValueError.
+    """
+    modes = [name for name, value in (("vector", vector), ("polar", polar),
+                                      ("max_bytes", max_bytes), ("solver", solver))
+             if value is not None]
+    if len(modes) > 1:
+        raise ValueError(f"{' and '.join(modes)} cannot be combined")
+    if modes and cache is not None:
+        raise ValueError(f"cache is not used with {modes[0]}")
+
+    array = ElectrodeArray.from_pairs(pairs, total_I, arc=arc)
+
+    if vector is not None:
+        orientations = None if vector == "max" else vector
+        AM_max, AM_dir = envelope_map(array, grid, sigma_dc, eps_r, orientations, dtype)
+        AM = AM_max if AM_dir is None else AM_dir[0]
+        return AM / np.max(AM) if normalize else AM
+
+    if polar is not None:
+        AM = polar.to_cartesian(polar.am(array, sigma_dc, eps_r, dtype), grid)
+        return AM / np.max(AM) if normalize else AM
+
+    if max_bytes is not None:
+        rows = 2 * len(array) + len(array.pairs) + 1
+        return evaluate_tiled(
+            grid,
+            lambda xs, ys: array.am(array.unit_fields(xs, ys, sigma_dc, eps_r, dtype)),
+            max_bytes, out=out, dtype=dtype, normalize=normalize,
+            bytes_per_point=48 + rows * np.dtype(dtype).itemsize,
+        )
 
-        R1 = np.sqrt((X - e1[0])**2 + (Y - e1[1])**2)
-        R2 = np.sqrt((X - e2[0])**2 + (Y - e2[1])**2)
+    if solver is not None:
+        U = solver.unit_fields(array, dtype)
+    elif cache is None:
+        U = array.unit_fields(grid.xs, grid.ys, sigma_dc, eps_r, dtype, grid.polar)
+    else:
+        U = cache.unit_fields(array, grid, sigma_dc, eps_r, dtype)
+    AM = array.am(U)
+    return AM / np.max(AM) if normalize else AM
 
-        V1 = V_point(I1, R1, p.w1, sigma_dc, eps_r)
-        V2 = V_point(I2, R2, p.w2, sigma_dc, eps_r)
 
-        A1, A2 = np.abs(V1), np.abs(V2)
-        AMs.append(2 * np.minimum(A1, A2))
+def compute_field_sweep(pairs, grid, carrier_pairs, total_I, sigma_dc, eps_r,
+                        dtype=np.float64, arc=None):
+    """Un-normalized (F, points) AM of all pairs for F (f1, f2) carrier pairs.
 
-    AM = np.sum(AMs, axis=0)
-    AM[mask] = np.nan
-    return AM / np.nanmax(AM)
+    carrier_pairs is (F, 2), shared by every pair, or (F, len(pairs), 2).
+    The pairs' own frequencies are ignored. Maps are left un-normalized so
+    that frequencies can be compared; use grid.scatter() for (F, N, N) images.
+    """
+    array = ElectrodeArray.from_pairs(pairs, total_I, arc=arc)
+    return array.am_sweep(grid.xs, grid.ys, carrier_pairs, sigma_dc, eps_r, dtype)
 
 
 # ============================================================================
 # FIELD VISUALIZER (the main class)
 # ============================================================================
 class FieldVisualizer:
+    ARC_LEN = 20  # degrees, drawn contact length (and modelled, with finite_contacts)
+    ELECTRODE_GAP = 0.5e-3  # m, drawn gap between nerve and contacts
+    IDLE_MS = 150  # slider idle time before refining to full resolution
+    POLL_MS = 40  # refinement timer period
+
     def __init__(self, pairs, Rn=3e-3, N=450,
                  total_I=2e-3, sigma_dc=0.3, eps_r=5000,
-                 show_sliders=True, cmap="plasma"):
+                 show_sliders=True, cmap="plasma", cache_bytes=256 * 2**20,
+                 dtype=np.float64, polar=None, finite_contacts=False, solver=None,
+                 store=None, vector=None, progressive=True, coarse=4, headless=False):
 
         self.pairs = pairs
         self.Rn = Rn
         self.total_I = total_I
         self.sigma_dc = sigma_dc
         self.eps_r = eps_r
+        show_sliders = show_sliders and not headless
         self.show_sliders = show_sliders
         self.cmap = cmap
+        self.cache = LeadFieldCache(cache_bytes, store=store)
+        self.dtype = dtype
+        self.arc = np.deg2rad(self.ARC_LEN) if finite_contacts else None
+        self.solver = solver
+        self.vector = vector
+        # Coarse-while-dragging needs a free grid, so not with the FD solver's
+        self.progressive = progressive and solver is None and not headless
+        self.headless = headless
 
         # ---------------- GRID ----------------
-        x = np.linspace(-Rn, Rn, N)
-        y = np.linspace(-Rn, Rn, N)
-        self.X, self.Y = np.meshgrid(x, y)
-        self.mask = (self.X**2 + self.Y**2) > Rn**2
+        self.grid = NerveGrid(Rn, N) if solver is None else solver.grid
+        # polar=True sizes the polar grid to this display grid
+        self.polar = PolarGrid.for_grid(self.grid) if polar is True else polar
+        self.X, self.Y = self.grid.meshgrid()
+        self.mask = self.grid.mask
 
         self.Xmm = self.X * 1e3
         self.Ymm = self.Y * 1e3
 
         # ---------------- INITIAL FIELD ----------------
-        self.AM = compute_field(
-            pairs, self.X, self.Y, self.mask,
-            total_I, sigma_dc, eps_r
-        )
+        # Raw AM of every pair, kept so a slider only recomputes its own pair
+        self.contributions = np.stack([self.pair_am(p) for p in pairs])
+        self.AM = self.grid.scatter(self.normalized_am())
+        self.frame_times = []
+
+        # ---------------- PROGRESSIVE RENDERING ----------------
+        # While dragging, the touched pair is recomputed on a grid `coarse`
+        # times smaller; once the sliders are idle the dirty pairs are refined
+        # on a background thread. Every slider event bumps the generation, so
+        # refinements of superseded positions are cancelled or discarded.
+        if self.progressive:
+            self.coarse_grid = NerveGrid(Rn, max(N // coarse, 16))
+            self.coarse_cache = LeadFieldCache(cache_bytes // coarse**2)
+            self.coarse_contributions = np.stack([
+                self.pair_am(p, self.coarse_grid, self.coarse_cache) for p in pairs
+            ])
+            self.generation = 0
+            self.dirty = set()
+            self.last_event = 0.0
+            self.refining = None
+            self.executor = ThreadPoolExecutor(max_workers=1)
 
         # ============================================================================
         #   FIGURE LAYOUT: Two panels if sliders, one panel if clean mode
         # ============================================================================
-        if show_sliders:
+        if headless:
+            # Agg canvas outside pyplot: no display, nothing kept alive by pyplot
+            self.fig = Figure(figsize=(7, 7), facecolor="black")
+            FigureCanvasAgg(self.fig)
+            self.ax = self.fig.subplots()
+
+        elif show_sliders:
             self.fig, (self.ax_ctrl, self.ax) = plt.subplots(
                 1, 2, figsize=(12, 6),
                 gridspec_kw={"width_ratios": [1, 2]},
@@ -138,26 +212,57 @@ class FieldVisualizer:
         if show_sliders:
             self.add_sliders()
 
+        if self.progressive:
+            # Results are applied from a canvas timer, i.e. on the GUI thread
+            self.timer = self.fig.canvas.new_timer(interval=self.POLL_MS)
+            self.timer.add_callback(self.poll_refinement)
+            self.timer.start()
+            self.fig.canvas.mpl_connect("close_event", lambda _: self.close())
+
+    def show(self):
         plt.show()
 
+    # ============================================================================
+    # FIELD
+    # ============================================================================
+    def pair_am(self, p, grid=None, cache=None):
+        '''Raw (un-normalized) AM contribution of one pair on the packed grid.'''
+        point_source = self.polar is None and self.solver is None and self.vector is None
+        if point_source and cache is None:
+            cache = self.cache
+        return compute_field(
+            [p], self.grid if grid is None else grid,
+            self.total_I, self.sigma_dc, self.eps_r,
+            cache=cache if point_source else None, dtype=self.dtype,
+            polar=self.polar, arc=self.arc, solver=self.solver, vector=self.vector,
+            normalize=False
+        )
+
+    def normalized_am(self, contributions=None):
+        AM = (self.contributions if contributions is None else contributions).sum(axis=0)
+        return AM / np.max(AM)
+
     # ============================================================================
     # DRAWING
     # ============================================================================
     def draw_field(self, initial=False):
-        cmap = plt.get_cmap(self.cmap)
-        rgba = cmap(self.AM)
-        rgba[self.mask, 3] = 0
-
+        # Scalar image through a fixed norm; NaN (outside the nerve) is transparent
         if initial:
+            self.norm = Normalize(vmin=0, vmax=1)
+            cmap = plt.get_cmap(self.cmap).with_extremes(bad=(0, 0, 0, 0))
             self.im = self.ax.imshow(
-                rgba,
+                self.AM,
+                cmap=cmap, norm=self.norm,
                 extent=[self.Xmm.min(), self.Xmm.max(),
                         self.Ymm.min(), self.Ymm.max()],
                 origin="lower",
                 interpolation="bilinear"
             )
+            self.frame_text = self.ax.text(
+                0.02, 0.02, "", color="white", fontsize=8, transform=self.ax.transAxes
+            )
         else:
-            self.im.set_data(rgba)
+            self.im.set_data(self.AM)
 
         # prevent cropping
         pad = 1.5
@@ -176,32 +281,48 @@ class FieldVisualizer:
 
     def draw_electrodes(self):
         Rnmm = self.Rn * 1e3
-        arc_len = 20
         lw = 18
-        dR = 0.5e-3
-        dRmm = dR * 1e3
+        dRmm = self.ELECTRODE_GAP * 1e3
 
+        self.electrode_artists = []
         for p in self.pairs:
-            θ = np.rad2deg(p.angle)
-
-            e1 = Arc((0,0), 2*(Rnmm + dRmm), 2*(Rnmm + dRmm),
-                     theta1=θ - arc_len/2, theta2=θ + arc_len/2,
-                     color=p.color_e1, lw=lw, capstyle="round",
+            e1 = Arc((0,0), 2*(Rnmm + dRmm), 2*(Rnmm + dRmm), lw=lw, capstyle="round",
                      zorder=30)
-            e2 = Arc((0,0), 2*(Rnmm + dRmm), 2*(Rnmm + dRmm),
-                     theta1=θ + 180 - arc_len/2,
-                     theta2=θ + 180 + arc_len/2,
-                     color=p.color_e2, lw=lw, capstyle="round",
+            e2 = Arc((0,0), 2*(Rnmm + dRmm), 2*(Rnmm + dRmm), lw=lw, capstyle="round",
                      zorder=30)
-
-            e1_label = Text((Rnmm + 2*dRmm) * np.cos(np.deg2rad(θ)), (Rnmm + 2*dRmm) * np.sin(np.deg2rad(θ)), p.label_e1, color=p.color_e1, ha='center', va='center')
-            e2_label = Text((Rnmm + 2*dRmm) * np.cos(np.deg2rad(θ + 180)), (Rnmm + 2*dRmm) * np.sin(np.deg2rad(θ + 180)), p.label_e2, color=p.color_e2, ha='center', va='center')
+            e1_label = Text(0, 0, ha='center', va='center')
+            e2_label = Text(0, 0, ha='center', va='center')
 
             self.ax.add_patch(e1)
             self.ax.add_patch(e2)
 
             self.ax.add_artist(e1_label)
             self.ax.add_artist(e2_label)
+            self.electrode_artists.append((e1, e2, e1_label, e2_label))
+
+        self.place_electrodes()
+
+    def place_electrodes(self):
+        '''Move the existing electrode artists to the current pair angles.'''
+        Rnmm = self.Rn * 1e3
+        arc_len = self.ARC_LEN
+        dRmm = self.ELECTRODE_GAP * 1e3
+
+        for p, (e1, e2, e1_label, e2_label) in zip(self.pairs, self.electrode_artists):
+            θ = np.rad2deg(p.angle)
+
+            e1.theta1, e1.theta2 = θ - arc_len/2, θ + arc_len/2
+            e2.theta1, e2.theta2 = θ + 180 - arc_len/2, θ + 180 + arc_len/2
+            e1.set_color(p.color_e1)
+            e2.set_color(p.color_e2)
+            e1.stale = e2.stale = True
+
+            e1_label.set_position(((Rnmm + 2*dRmm) * np.cos(np.deg2rad(θ)), (Rnmm + 2*dRmm) * np.sin(np.deg2rad(θ))))
+            e2_label.set_position(((Rnmm + 2*dRmm) * np.cos(np.deg2rad(θ + 180)), (Rnmm + 2*dRmm) * np.sin(np.deg2rad(θ + 180))))
+            e1_label.set_text(p.label_e1)
+            e2_label.set_text(p.label_e2)
+            e1_label.set_color(p.color_e1)
+            e2_label.set_color(p.color_e2)
 
     # ============================================================================
     # SLIDER PANEL
@@ -248,44 +369,174 @@ class FieldVisualizer:
                 self.sliders.append((label, i, s))
                 row_index += 1
 
-        # assign callback
-        for _, _, s in self.sliders:
-            s.on_changed(self.update)
+        # assign callback: each slider knows which pair and parameter it drives
+        for label, i, s in self.sliders:
+            s.on_changed(lambda v, label=label, i=i: self.update(label, i, v))
 
     # ============================================================================
-    # UPDATE LOGIC (FAST: only field recalculation)
+    # UPDATE LOGIC (FAST: only the touched pair is recomputed)
     # ============================================================================
-    def update(self, _):
-        # update model values
-        for label, idx, slider in self.sliders:
-            p = self.pairs[idx]
-            v = slider.val
-
-            if label == "Angle":
-                p.angle = np.deg2rad(v)
-            elif label == "Weight":
-                p.weight = v
-            elif label == "Steer":
-                p.steer = v
-
-        # fast recompute
-        self.AM = compute_field(
-            self.pairs, self.X, self.Y, self.mask,
-            self.total_I, self.sigma_dc, self.eps_r
-        )
+    def update(self, label, i, v):
+        t0 = time.perf_counter()
+
+        # update model value
+        p = self.pairs[i]
+        if label == "Angle":
+            p.angle = np.deg2rad(v)
+        elif label == "Weight":
+            p.weight = v
+        elif label == "Steer":
+            p.steer = v
+
+        if self.progressive:
+            # coarse preview now, full resolution once idle
+            self.coarse_contributions[i] = self.pair_am(p, self.coarse_grid, self.coarse_cache)
+            self.im.set_data(self.coarse_grid.scatter(self.normalized_am(self.coarse_contributions)))
+            self.dirty.add(i)
+            self.generation += 1
+            self.last_event = time.perf_counter()
+            if self.refining is not None and self.refining.cancel():
+                self.refining = None
+        else:
+            # recompute that pair only, then re-reduce
+            self.contributions[i] = self.pair_am(p)
+            self.grid.scatter(self.normalized_am(), out=self.AM)
+            self.draw_field(initial=False)
 
-        # update imshow
-        self.draw_field(initial=False)
+        self.report_frame_time(time.perf_counter() - t0)
         self.fig.canvas.draw_idle()
 
+    # ============================================================================
+    # BACKGROUND REFINEMENT
+    # ============================================================================
+    def refine(self, generation, pairs):
+        '''Full-resolution AM of the given {index: pair snapshot}; runs on the worker.'''
+        results = {}
+        for i, p in pairs.items():
+            if generation != self.generation:
+                return generation, None  # superseded, stop early
+            results[i] = self.pair_am(p)
+        return generation, results
+
+    def poll_refinement(self):
+        '''Timer callback: apply a finished refinement, or start one once the sliders are idle.'''
+        job = self.refining
+        if job is not None and job.done():
+            self.refining = None
+            generation, results = job.result()
+            if results is not None and generation == self.generation:
+                for i, AM in results.items():
+                    self.contributions[i] = AM
+                self.dirty.difference_update(results)
+                self.grid.scatter(self.normalized_am(), out=self.AM)
+                self.draw_field(initial=False)
+                self.fig.canvas.draw_idle()
+
+        idle = time.perf_counter() - self.last_event > self.IDLE_MS / 1e3
+        if self.dirty and self.refining is None and idle:
+            pairs = {i: copy.copy(self.pairs[i]) for i in self.dirty}
+            self.refining = self.executor.submit(self.refine, self.generation, pairs)
+
+    def close(self):
+        self.timer.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # ============================================================================
+    # HEADLESS OUTPUT
+    # ============================================================================
+    def set_pairs(self, pairs):
+        '''Show another configuration with the same number of pairs, reusing every artist.'''
+        if len(pairs) != len(self.pairs):
+            raise ValueError("set_pairs needs as many pairs as the visualizer was built with")
+        self.pairs = pairs
+        self.contributions = np.stack([self.pair_am(p) for p in pairs])
+        self.grid.scatter(self.normalized_am(), out=self.AM)
+        self.draw_field(initial=False)
+        self.place_electrodes()
+
+    def to_array(self, dpi=100) -> np.ndarray:
+        '''(H, W, 4) uint8 RGBA rendering of the current figure.'''
+        self.fig.set_dpi(dpi)
+        self.fig.canvas.draw()
+        return np.asarray(self.fig.canvas.buffer_rgba()).copy()
+
+    def save(self, path, dpi=100):
+        '''Write the figure; the format (png, svg, ...) follows the file extension.'''
+        self.fig.savefig(path, dpi=dpi, facecolor=self.fig.get_facecolor())
+
+    def report_frame_time(self, dt):
+        self.frame_times.append(dt)
+        recent = self.frame_times[-20:]
+        self.frame_text.set_text(f"{1e3 * dt:.1f} ms (mean {1e3 * np.mean(recent):.1f} ms)")
+
 
 # ============================================================================
-# Example run
+# HEADLESS BATCH RENDERING
 # ============================================================================
-pairs = [
-    ElectrodePair(0,   "#ff5bc8", "#5bb0ff", steer=0.0, label_e1="E1", label_e2="E2"),
-    ElectrodePair(60, "#3f3f3f", "#3f3f3f", steer=-0.0, label_e1="E3", label_e2="E4"),
-    ElectrodePair(120, "#3f3f3f", "#3f3f3f", steer=0.0, label_e1="E5", label_e2="E6")
-]
+def _render_chunk(jobs, dpi, kwargs):
+    viz = None
+    out = []
+    for pairs, path in jobs:
+        if viz is None:
+            viz = FieldVisualizer(pairs, headless=True, **kwargs)
+        else:
+            viz.set_pairs(pairs)
+        if path is None:
+            out.append(viz.to_array(dpi))
+        else:
+            viz.save(path, dpi)
+            out.append(path)
+    return out
+
+
+def render(configs, paths=None, processes=None, dpi=100, **kwargs):
+    """Render many pair configurations without a display.
+
+    One Agg figure and artist set is built per process and reused for every
+    configuration, so only the field and electrode positions change
+    between renders. All configurations must have the same number of pairs.
+    -----
+    Parameters:
+    configs : list
+        Lists of ElectrodePair, one per figure.
+    paths : list, optional
+        Output file per configuration (.png, .svg, ...). Without paths the
+        figures are returned as (H, W, 4) uint8 RGBA arrays.
+    processes : int, optional
+        Worker processes; None or 1 renders in this process.
+    dpi : int
+        Output resolution.
+    **kwargs
+        FieldVisualizer options (Rn, N, cmap, dtype, ...).
+    -------
+    Returns:
+    list
+        The written paths, or the RGBA arrays, in configuration order.
+    """
+
+    jobs = list(zip(configs, [None] * len(configs) if paths is None else paths))
+    if not processes or processes == 1 or len(jobs) < 2:
+        return _render_chunk(jobs, dpi, kwargs)
+
+    chunks = [jobs[i::processes] for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(_render_chunk, [(c, dpi, kwargs) for c in chunks if c])
+    # undo the round-robin split
+    out = [None] * len(jobs)
+    for i, chunk in enumerate(results):
+        out[i::processes] = chunk
+    return out
+
 
-viz = FieldVisualizer(pairs, show_sliders=True, cmap='plasma')
\ No newline at end of file
+# ============================================================================
+# Example run
+# ============================================================================
+if __name__ == "__main__":
+    pairs = [
+        ElectrodePair(0,   "#ff5bc8", "#5bb0ff", steer=0.0, label_e1="E1", label_e2="E2"),
+        ElectrodePair(60, "#3f3f3f", "#3f3f3f", steer=-0.0, label_e1="E3", label_e2="E4"),
+        ElectrodePair(120, "#3f3f3f", "#3f3f3f", steer=0.0, label_e1="E5", label_e2="E6")
+    ]
+
+    viz = FieldVisualizer(pairs, show_sliders=True, cmap='plasma', store=LeadFieldStore())
+    viz.show()
\ No newline at end of file
@@ -3,6 +3,10 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation, FFMpegWriter
 from matplotlib.patches import Circle
 
+from electrodes import ElectrodeArray
+from fields import NerveGrid
+from leadfield import LeadFieldCache, LeadFieldStore
+
 # Optional style
 try:
     plt.style.use("custom_dark_bg.mplstyle")
@@ -12,14 +16,6 @@ except OSError:
 # === Physical constants ===
 sigma_dc = 0.3
 eps_r = 5000
-eps0 = 8.854e-12
-
-def sigma_star(omega, sigma=sigma_dc, eps_r=eps_r):
-    return sigma + 1j * omega * eps0 * eps_r
-
-def V_point(I, r, omega):
-    sig = sigma_star(omega)
-    return I / (4 * np.pi * sig * np.maximum(r, 1e-6))
 
 
 # === Frequencies & waveform time ===
@@ -34,34 +30,26 @@ base_current_amp = 2e-3  # 0.002 A max per wave when fully "on"
 # === Nerve geometry ===
 Rn = 1.5e-3
 N = 200
-x = np.linspace(-Rn, Rn, N)
-y = np.linspace(-Rn, Rn, N)
-X, Y = np.meshgrid(x, y)
-
-mask = (X**2 + Y**2) > Rn**2
+grid = NerveGrid(Rn, N)
+x, y = grid.x, grid.y
+X, Y = grid.xs, grid.ys  # interior points only
 
 # Electrode positions
 e1 = np.array([Rn, 0.0])   # right
 e2 = np.array([-Rn, 0.0])  # left
 
-R1 = np.sqrt((X - e1[0])**2 + (Y - e1[1])**2)
-R2 = np.sqrt((X - e2[0])**2 + (Y - e2[1])**2)
+# Unit-current |V| maps, memory-mapped from the lead-field store after the first run
+U1, U2 = LeadFieldCache(store=LeadFieldStore()).unit_maps(
+    ElectrodeArray([e1, e2], 1.0, [f1, f2]), grid, sigma_dc, eps_r)
 
 total_I_global = 2e-3
 
 def compute_fields(I1, I2):
-    """Return raw A1, A2, AM_raw with NO masking (for physics)."""
-    V1 = V_point(I1, R1, w1)
-    V2 = V_point(I2, R2, w2)
-
-    A1 = np.abs(V1)
-    A2 = np.abs(V2)
-
-    A1 = np.where(mask, 0.0, A1)
-    A2 = np.where(mask, 0.0, A2)
+    """Return raw A1, A2, AM_raw on the packed interior points (grid.scatter for images)."""
+    A1 = abs(I1) * U1
+    A2 = abs(I2) * U2
 
     AM_raw = 2 * np.minimum(A1, A2)
-    AM_raw = np.where(mask, 0.0, AM_raw)
 
     return A1, A2, AM_raw
 
@@ -111,15 +99,12 @@ A1_init, A2_init, AM_init = compute_fields(total_I_global/2, total_I_global/2)
 A1_norm = A1_init / (np.max(A1_init)+1e-18)
 A2_norm = A2_init / (np.max(A2_init)+1e-18)
 
-A1_alpha = np.where(mask, 0.0, A1_norm)
-A2_alpha = np.where(mask, 0.0, A2_norm)
-
 rgba1 = np.zeros((N, N, 4))
 rgba2 = np.zeros((N, N, 4))
 rgba1[...,0] = 1.0   # red tint
 rgba2[...,2] = 1.0   # blue tint
-rgba1[...,3] = A1_alpha
-rgba2[...,3] = A2_alpha
+grid.scatter(A1_norm, out=rgba1[...,3])  # alpha stays 0 outside the nerve
+grid.scatter(A2_norm, out=rgba2[...,3])
 
 im_e1 = ax_field_indiv.imshow(rgba1, extent=extent_mm, origin="lower")
 im_e2 = ax_field_indiv.imshow(rgba2, extent=extent_mm, origin="lower")
@@ -130,10 +115,10 @@ ax_field_indiv.set_title("Individual Electrode Fields")
 
 # === RIGHT: AM field ===
 AM_norm_init = AM_init / (AM_global_max + 1e-18)
-AM_norm_init_plot = np.where(mask, np.nan, AM_norm_init)
+AM_plot = grid.scatter(AM_norm_init)  # NaN outside the nerve, reused every frame
 
 im_AM = ax_field_am.imshow(
-    AM_norm_init_plot, extent=extent_mm, origin="lower", cmap="plasma"
+    AM_plot, extent=extent_mm, origin="lower", cmap="plasma"
 )
 ax_field_am.add_patch(Circle((0,0), Rn*1e3, fill=False, color="white"))
 ax_field_am.axis("off")
@@ -189,14 +174,14 @@ def update(frame):
     A1_vis = (A1 / (np.max(A1)+1e-18)) ** gamma
     A2_vis = (A2 / (np.max(A2)+1e-18)) ** gamma
 
-    rgba1[...,3] = np.where(mask, 0.0, A1_vis)
-    rgba2[...,3] = np.where(mask, 0.0, A2_vis)
+    grid.scatter(A1_vis, out=rgba1[...,3])
+    grid.scatter(A2_vis, out=rgba2[...,3])
     im_e1.set_data(rgba1)
     im_e2.set_data(rgba2)
 
     # AM field visualization
     AM_norm = AM_raw / (AM_global_max + 1e-18)
-    im_AM.set_data(np.where(mask, np.nan, AM_norm))
+    im_AM.set_data(grid.scatter(AM_norm, out=AM_plot))
 
     # --- 3. Distance-based amplitudes (what you asked for) ---
     # Distances from point to each electrode
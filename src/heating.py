@@ -26,7 +26,7 @@
 
 import numpy as np
 
-from waveforms import electrode_waveform
+from waveform_cache import WaveformCache
 
 import matplotlib.pyplot as plt
 
@@ -65,6 +65,8 @@ n_pulses = 1# number of pulses
 
 TD = n_pulses / PRF  # seconds, total duration of the waveform
 
+waveform_cache = WaveformCache()  # carriers shared between pairs are generated once
+
 
 
 # Tissue Properties
@@ -290,31 +292,43 @@ def tissue_heating(c: float, E: float, mass: float) -> float:
 
 
 
-results = []
+def carrier_pair_heating(f1: float, f2: float, R: float = R_track[1]) -> float:
 
+    '''Temperature rise in extracellular tissue from the track losses of one carrier pair.
 
+    -----
 
-delta_Ts = []
+    Parameters:
 
-for i, pair in enumerate(carrier_pairs):
+    f1, f2 : float
 
-    f1,f2 = pair
+        Carrier frequencies in Hz.
 
-    f_mod = abs(f1 - f2) if abs(f1 - f2) != 0 else f1
+    R : float
 
-    I_1= electrode_waveform(A, TD, PRF, BD, f1, f_s)[0]
-    print(I_1.mean())
+        Track resistance in ohms (Ω).
 
+    -------
 
-    I_2= electrode_waveform(A, TD, PRF, BD, f2, f_s)[0]
+    Returns:
 
+    float
 
+        The temperature rise in Kelvin (K).
 
+    '''
 
 
-    #for R in R_track:
 
-    R = R_track[1]
+    f_mod = abs(f1 - f2) if abs(f1 - f2) != 0 else f1
+
+    I_1= waveform_cache.electrode_waveform(A, TD, PRF, BD, f1, f_s)[0]
+    print(I_1.mean())
+
+
+    I_2= waveform_cache.electrode_waveform(A, TD, PRF, BD, f2, f_s)[0]
+
+
 
     E_1 = energy_dissipated(R, I_1)
 
@@ -344,52 +358,58 @@ for i, pair in enumerate(carrier_pairs):
 
     print(f"Modulation Frequency: {f_mod} Hz, Resistance: {R} Ohms, \nTemperature Rise in Nerve Tissue: {delta_T:.4f} K")
 
+    return delta_T
+
+
 
+if __name__ == "__main__":
+
+    #for R in R_track:
 
-    delta_Ts.append(delta_T)
+    delta_Ts = [carrier_pair_heating(f1, f2) for f1, f2 in carrier_pairs]
 
 
 
-#plot reuslts
+    #plot reuslts
 
-plt.figure(figsize=(7,5))
+    plt.figure(figsize=(7,5))
 
 
 
-# for tissue_label, color, marker in [
+    # for tissue_label, color, marker in [
 
-#     ("Nerve", "tab:blue", "o"),
+    #     ("Nerve", "tab:blue", "o"),
 
-#     ("Surrounding", "tab:orange", "^"),
+    #     ("Surrounding", "tab:orange", "^"),
 
-# ]:
+    # ]:
 
-#     x = [r["f_mod"] for r in results if r["tissue"] == tissue_label]
+    #     x = [r["f_mod"] for r in results if r["tissue"] == tissue_label]
 
-#     y = [r["delta_T"] for r in results if r["tissue"] == tissue_label]
+    #     y = [r["delta_T"] for r in results if r["tissue"] == tissue_label]
 
 
 
-#     plt.scatter(x, y, label=tissue_label, color=color, marker=marker)
+    #     plt.scatter(x, y, label=tissue_label, color=color, marker=marker)
 
 
 
-plt.scatter(x=[(f"{pair[0]} Hz & {pair[1]} Hz") for pair in carrier_pairs],
+    plt.scatter(x=[(f"{pair[0]} Hz & {pair[1]} Hz") for pair in carrier_pairs],
 
-            y=delta_Ts,
+                y=delta_Ts,
 
-            color="tab:blue", marker="o")
+                color="tab:blue", marker="o")
 
-plt.axhline(275.15, linestyle="--", color="red", label="2 °C limit")
+    plt.axhline(275.15, linestyle="--", color="red", label="2 °C limit")
 
-plt.xlabel("Modulation Frequency (Hz)")
+    plt.xlabel("Modulation Frequency (Hz)")
 
-plt.ylabel("Temperature Rise (K)")
+    plt.ylabel("Temperature Rise (K)")
 
-plt.title("Temperature Rise vs Modulation Frequency")
+    plt.title("Temperature Rise vs Modulation Frequency")
 
-plt.legend()
+    plt.legend()
 
-plt.xscale("log")  
+    plt.xscale("log")  
 
-plt.show()
\ No newline at end of file
+    plt.show()
\ No newline at end of file
@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+
+from cache import LRUCache
+from electrodes import ElectrodeArray
+from fields import SOLVER_VERSION, tissue_key
+
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".leadfields")
+_DIGEST = re.compile(r"[0-9a-f]{16}")
+_MAP = re.compile(r"[0-9a-f]{16}\.npy")
+
+
+class LeadFieldCache:
+    '''Cache of unit-current |V| maps, one per electrode.
+
+    The field is linear in the injected current, so the |V| map of an
+    electrode driven with current I is just I times its unit-current map.
+    Maps are keyed by the electrode's angle and radius, the grid (Rn, N),
+    the tissue and omega, plus the arc length and quadrature nodes for
+    finite contacts, so that weight and steer changes only
+    rescale cached maps, and an angle change only costs one new map per
+    moved electrode.
+    -----
+    Parameters:
+    max_bytes : int
+        Memory budget for the stored maps (least recently used are evicted).
+    store : LeadFieldStore, optional
+        On-disk store checked on a miss before computing; computed maps are
+        written to it.
+    '''
+
+    def __init__(self, max_bytes: int = 256 * 2**20, store=None):
+        self._maps = LRUCache(max_bytes)
+        self.store = store
+
+    @staticmethod
+    def key(angle, radius, Rn, N, sigma_dc, eps_r, omega, arc=None, dtype=np.float64,
+            n_nodes=16) -> tuple:
+        '''Key of the map of an electrode at (angle, radius) on a grid of radius Rn and size N.'''
+        angle = np.round(np.mod(angle, 2 * np.pi), 12) % np.round(2 * np.pi, 12)
+        return (float(angle), float(np.round(radius, 15)), float(Rn), int(N),
+                tissue_key(sigma_dc, eps_r), float(omega),
+                None if arc is None else (float(arc), int(n_nodes)), np.dtype(dtype).str)
+
+    def _lookup(self, key):
+        U = self._maps.get(key)
+        if U is None and self.store is not None:
+            U = self.store.load(key)
+            if U is not None:
+                self._maps.put(key, U)
+        return U
+
+    def _insert(self, key, U):
+        U.setflags(write=False)
+        self._maps.put(key, U)
+        if self.store is not None:
+            self.store.save(key, U)
+
+    def unit_map(self, angle, radius, Rn, N, sigma_dc, eps_r, omega, compute, arc=None,
+                 dtype=np.float64, n_nodes=16) -> np.ndarray:
+        '''Return the cached unit-current map, calling compute() on a miss.'''
+        key = self.key(angle, radius, Rn, N, sigma_dc, eps_r, omega, arc, dtype, n_nodes)
+        U = self._lookup(key)
+        if U is None:
+            U = compute()
+            self._insert(key, U)
+        return U
+
+    def unit_maps(self, array, grid, sigma_dc, eps_r, dtype=np.float64) -> list:
+        '''Read-only (points,) unit field of every electrode of an ElectrodeArray on grid.
+
+        Maps are returned as stored, without copying: a map loaded from the
+        store is its np.memmap. The electrodes not cached are computed
+        together in one batch.
+        '''
+        angles = np.arctan2(array.positions[:, 1], array.positions[:, 0])
+        radii = np.hypot(*array.positions.T)
+        keys = [self.key(a, r, grid.Rn, grid.N, sigma_dc, eps_r, 2 * np.pi * f, array.arc, dtype,
+                         array.n_nodes)
+                for a, r, f in zip(angles, radii, array.frequencies)]
+
+        maps = [self._lookup(key) for key in keys]
+        missing = [e for e, U in enumerate(maps) if U is None]
+        if missing:
+            moved = ElectrodeArray(array.positions[missing], 1.0, array.frequencies[missing],
+                                   arc=array.arc, n_nodes=array.n_nodes)
+            computed = moved.unit_fields(grid.xs, grid.ys, sigma_dc, eps_r, dtype, grid.polar)
+            for e, U in zip(missing, computed):
+                maps[e] = U.copy()
+                self._insert(keys[e], maps[e])
+        return maps
+
+    def unit_fields(self, array, grid, sigma_dc, eps_r, dtype=np.float64) -> np.ndarray:
+        '''(E, points) unit fields of an ElectrodeArray on the cuff of grid.
+
+        The maps of unit_maps stacked into one array, as ElectrodeArray.am
+        expects; this copies them. Use unit_maps to index single maps
+        without materializing memory-mapped ones.
+        '''
+        return np.stack(self.unit_maps(array, grid, sigma_dc, eps_r, dtype))
+
+    def clear(self):
+        self._maps.clear()
+
+    def stats(self) -> dict:
+        return self._maps.stats()
+
+
+class LeadFieldStore:
+    '''Unit-current maps persisted on disk as .npy files, loaded memory-mapped.
+
+    Maps sharing a geometry (grid size, Rn, tissue parameters, dtype and
+    solver version) live in one directory named by a hash of that geometry,
+    one file per (angle, radius, omega, arc and nodes). Loading returns a read-only np.memmap,
+    so scripts reuse maps from earlier runs without recomputing them, and,
+    through LeadFieldCache.unit_maps, without copying them. Opening the store deletes directories written by another solver
+    version or store layout; files and directories the store did not write
+    (no digest name, or no manifest with its marker) are never touched, so
+    root may be shared with other data.
+
+    The store is bounded: once its maps exceed max_bytes, the least
+    recently used files (by modification time, refreshed on every load) are
+    deleted down to 90% of the budget. Continuous angle sliders therefore
+    cycle through a fixed amount of disk instead of growing it without end.
+    -----
+    Parameters:
+    root : str
+        Store directory.
+    version : int
+        Solver version of the stored maps (fields.SOLVER_VERSION).
+    max_bytes : int
+        Disk budget for the stored maps.
+    '''
+
+    LAYOUT = 3  # bump when the key or file layout changes
+    MARKER = "leadfield-store"
+
+    def __init__(self, root: str = DEFAULT_STORE, version: int = SOLVER_VERSION,
+                 max_bytes: int = 1024 * 2**20):
+        self.root = root
+        self.version = version
+        self.max_bytes = int(max_bytes)
+        os.makedirs(root, exist_ok=True)
+        self.invalidate()
+        self.nbytes = sum(size for _, _, size in self._files())
+        self.evict()
+
+    def _directories(self):
+        '''(path, manifest) of every geometry directory written by a store.
+
+        Only directories named by a geometry digest whose manifest carries
+        the store marker are the store's; anything else under root is left
+        alone.
+        '''
+        directories = []
+        for entry in os.scandir(self.root):
+            if not (entry.is_dir() and _DIGEST.fullmatch(entry.name)):
+                continue
+            try:
+                with open(os.path.join(entry.path, "manifest.json")) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if isinstance(manifest, dict) and manifest.get("store") == self.MARKER:
+                directories.append((entry.path, manifest))
+        return directories
+
+    def invalidate(self):
+        '''Remove geometry directories written by a different solver version or layout.'''
+        for path, manifest in self._directories():
+            if (manifest.get("version"), manifest.get("layout")) != (self.version, self.LAYOUT):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _files(self):
+        '''(mtime, path, size) of every stored map.'''
+        files = []
+        for directory, _ in self._directories():
+            for entry in os.scandir(directory):
+                if _MAP.fullmatch(entry.name):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((st.st_mtime, entry.path, st.st_size))
+        return files
+
+    def evict(self):
+        '''Delete least recently used maps until the store is within budget.'''
+        if self.nbytes <= self.max_bytes:
+            return
+        # Rescan: other processes may share the store
+        files = sorted(self._files())
+        self.nbytes = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self.nbytes <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.nbytes -= size
+
+    def _path(self, key):
+        angle, radius, Rn, N, tissue, omega, arc, dtype = key
+        geometry = {"Rn": Rn, "N": N, "tissue": tissue, "dtype": dtype, "version": self.version,
+                    "layout": self.LAYOUT, "store": self.MARKER}
+        digest = hashlib.sha1(json.dumps(geometry, sort_keys=True).encode()).hexdigest()[:16]
+        name = hashlib.sha1(repr((angle, radius, omega, arc)).encode()).hexdigest()[:16]
+        directory = os.path.join(self.root, digest)
+        return directory, os.path.join(directory, name + ".npy"), geometry
+
+    def load(self, key):
+        '''Memory-mapped map for a LeadFieldCache key, or None if not stored.'''
+        _, path, _ = self._path(key)
+        try:
+            U = np.load(path, mmap_mode="r")
+            os.utime(path)  # mark as recently used
+            return U
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key, U):
+        directory, path, geometry = self._path(key)
+        manifest = os.path.join(directory, "manifest.json")
+        # Write then rename, so a concurrent reader never sees a partial file
+        if not os.path.exists(manifest):
+            os.makedirs(directory, exist_ok=True)
+            tmp = f"{manifest}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(geometry, f)
+            os.replace(tmp, manifest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(U))
+        if os.path.exists(path):
+            self.nbytes -= os.path.getsize(path)
+        os.replace(tmp, path)
+        self.nbytes += os.path.getsize(path)
+        self.evict()
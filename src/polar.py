@@ -0,0 +1,135 @@
+import numpy as np
+import scipy.sparse as sp
+
+from electrodes import ElectrodeArray
+from fields import tissue_key
+
+
+class PolarGrid:
+    '''(r, θ) grid over the nerve disk for electrodes sitting on the cuff circle.
+
+    Rotating an electrode around the cuff only rotates its field, so each
+    carrier's unit field is computed once for an electrode at θ = 0, and an
+    electrode at θ = m * dθ is served by rolling that map by m columns.
+    Electrode angles are rounded to the nearest multiple of dθ.
+
+    The polar AM is only an intermediate for a Cartesian display, so the
+    grid is sized to that display (see for_grid) rather than to its pixel
+    count: radii two display pixels apart and 1° steps, so that
+    degree-valued angles are exact. The defaults match the visualizer's
+    450 x 450 grid (114 x 360).
+
+    Resampling interpolates the AM itself, which has kinks where the
+    carriers' |V| cross, so the error is first order in the steps. Against
+    the Cartesian AM on the 450 grid: ~2e-5 of the peak for unsteered
+    pairs, ~3e-3 for steered ones (about one 8-bit colormap level), and up
+    to a few percent within ~0.05 Rn of a strongly steered contact, where
+    a 1° step spans ~4 display pixels. Refining there takes finer angles
+    and radii together (456 x 1440 gives ~6e-3), which costs the speed the
+    polar grid is for; use the Cartesian path when values next to the
+    contacts matter.
+    -----
+    Parameters:
+    Rn : float
+        Nerve (and cuff) radius in meters (m).
+    n_r : int
+        Number of radii, from 0 to Rn inclusive.
+    n_theta : int
+        Number of angles over the full circle.
+    '''
+
+    def __init__(self, Rn: float, n_r: int = 114, n_theta: int = 360):
+        self.Rn = Rn
+        self.n_r = n_r
+        self.n_theta = n_theta
+        self.r = np.linspace(0, Rn, n_r)
+        self.dtheta = 2 * np.pi / n_theta
+        self.theta = self.dtheta * np.arange(n_theta)
+        R, T = np.meshgrid(self.r, self.theta, indexing="ij")
+        self.xs = (R * np.cos(T)).ravel()
+        self.ys = (R * np.sin(T)).ravel()
+        self._unit = {}
+        self._resample = {}
+
+    @classmethod
+    def for_grid(cls, grid, n_theta: int = 360):
+        '''PolarGrid for displaying on a NerveGrid: radii two display pixels apart.'''
+        return cls(grid.Rn, int(np.ceil((grid.N - 1) / 4)) + 1, n_theta)
+
+    @property
+    def shape(self):
+        return (self.n_r, self.n_theta)
+
+    def shift(self, angle):
+        '''Column shift(s) of an electrode at angle (rad).'''
+        return np.rint(np.asarray(angle) / self.dtheta).astype(int) % self.n_theta
+
+    def unit_field(self, omega, sigma_dc, eps_r, dtype=np.float64, arc=None,
+                   n_nodes=16) -> np.ndarray:
+        '''(n_r, n_theta) unit-current |V| of an electrode at θ = 0, computed once.
+
+        With arc (rad), the contact is a finite arc integrated by Gauss
+        quadrature; that kernel is also computed once and then only rolled.
+        '''
+        key = (float(omega), tissue_key(sigma_dc, eps_r), np.dtype(dtype).str, arc, n_nodes)
+        if key not in self._unit:
+            electrode = ElectrodeArray([self.Rn, 0.0], 1.0, omega / (2 * np.pi),
+                                       arc=arc, n_nodes=n_nodes)
+            U = electrode.unit_fields(self.xs, self.ys, sigma_dc, eps_r, dtype)
+            U = U.reshape(self.shape)
+            U.setflags(write=False)
+            self._unit[key] = U
+        return self._unit[key]
+
+    def electrode_field(self, angle, omega, sigma_dc, eps_r, dtype=np.float64, arc=None,
+                        n_nodes=16) -> np.ndarray:
+        '''Unit-current |V| of an electrode at angle (rad), by rolling the θ = 0 map.'''
+        U = self.unit_field(omega, sigma_dc, eps_r, dtype, arc, n_nodes)
+        return np.roll(U, self.shift(angle), axis=1)
+
+    def unit_fields(self, array, sigma_dc, eps_r, dtype=np.float64) -> np.ndarray:
+        '''(E, n_r * n_theta) unit fields of an ElectrodeArray on the cuff, as one gather.'''
+        omegas, f_index = np.unique(2 * np.pi * array.frequencies, return_inverse=True)
+        table = np.stack([self.unit_field(w, sigma_dc, eps_r, dtype, array.arc, array.n_nodes)
+                          for w in omegas])
+        shift = self.shift(np.arctan2(array.positions[:, 1], array.positions[:, 0]))
+        cols = (np.arange(self.n_theta) - shift[:, None]) % self.n_theta
+        U = table[f_index[:, None, None], np.arange(self.n_r)[None, :, None], cols[:, None, :]]
+        return U.reshape(len(array), -1)
+
+    def am(self, array, sigma_dc, eps_r, dtype=np.float64) -> np.ndarray:
+        '''Un-normalized AM of an ElectrodeArray on the polar grid, (n_r, n_theta).'''
+        return array.am(self.unit_fields(array, sigma_dc, eps_r, dtype)).reshape(self.shape)
+
+    # ------------------------------------------------------------------------
+    # Display
+    # ------------------------------------------------------------------------
+    def _weights(self, grid):
+        key = (grid.Rn, grid.N)
+        if key not in self._resample:
+            fi = np.hypot(grid.xs, grid.ys) / self.Rn * (self.n_r - 1)
+            fj = np.mod(np.arctan2(grid.ys, grid.xs), 2 * np.pi) / self.dtheta
+            i0 = np.clip(np.floor(fi).astype(int), 0, self.n_r - 2)
+            j0 = np.floor(fj).astype(int) % self.n_theta
+            a = np.clip(fi - i0, 0, 1)
+            b = fj - np.floor(fj)
+            index = np.stack([
+                i0 * self.n_theta + j0,
+                i0 * self.n_theta + (j0 + 1) % self.n_theta,
+                (i0 + 1) * self.n_theta + j0,
+                (i0 + 1) * self.n_theta + (j0 + 1) % self.n_theta,
+            ])
+            weight = np.stack([(1 - a) * (1 - b), (1 - a) * b, a * (1 - b), a * b])
+            self._resample[key] = sp.csr_matrix(
+                (weight.T.ravel(), index.T.ravel(), np.arange(0, index.size + 1, 4)),
+                shape=(len(grid), self.n_r * self.n_theta))
+        return self._resample[key]
+
+    def to_cartesian(self, values, grid) -> np.ndarray:
+        '''Bilinearly resample (n_r, n_theta) values onto the packed points of a NerveGrid.
+
+        The interpolation is a sparse (points, n_r * n_theta) matrix built
+        once per grid, so resampling is a single matrix-vector product.
+        '''
+        values = np.asarray(values)
+        return (self._weights(grid) @ values.reshape(-1)).astype(values.dtype, copy=False)
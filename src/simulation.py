@@ -2,32 +2,30 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.widgets import Slider
-from matplotlib.patches import Circle, Ellipse
+from matplotlib.patches import Circle
+
+from electrodes import ElectrodeArray
+from fascicles import FascicleMap, random_fascicles
+from fields import NerveGrid, evaluate_tiled
+from leadfield import LeadFieldCache, LeadFieldStore
 
 # === Physical constants ===
 A = 1e-6
 a = np.sqrt(A / np.pi)
 sigma_dc = 0.3
 eps_r = 5000
-eps0 = 8.854e-12
-
-
-def sigma_star(omega, sigma=sigma_dc, eps_r=eps_r):
-    return sigma + 1j * omega * eps0 * eps_r
-
-
-def V_point(I, r, omega, sigma_dc=sigma_dc, eps_r=eps_r):
-    sig = sigma_star(omega, sigma_dc, eps_r)
-    return I / (4 * np.pi * sig * np.maximum(r, 1e-6))
 
 
 # === Scene setup ===
 Rn = 1.5e-3
 N = 400
-x = np.linspace(-Rn, Rn, N)
-y = np.linspace(-Rn, Rn, N)
-X, Y = np.meshgrid(x, y)
-mask = (X**2 + Y**2) > Rn**2
+grid = NerveGrid(Rn, N)
+X, Y = grid.xs, grid.ys  # interior points only
+lead_fields = LeadFieldCache(store=LeadFieldStore())  # unit maps persist across runs
+
+# Fascicles, rasterized once onto the grid for per-fascicle statistics
+fascicles = random_fascicles(15, Rn, rng=0)
+fascicle_map = FascicleMap(fascicles, grid)
 
 total_I_global = 2e-3  # total current (A)
 f1, f2 = 20e3, 22e3
@@ -51,31 +49,38 @@ normalize_weights(pairs)
 
 
 # === Compute AM envelope ===
-def compute_am(pairs):
-    AM_list = []
-    for p in pairs:
-        th = np.deg2rad(p["angle"])
-        total_I = total_I_global * p["weight"]
-        steer = (p["steer"] + 1) / 2
-        I1 = steer * total_I
-        I2 = (1 - steer) * total_I
+def compute_am(pairs, max_bytes=None, out=None):
+    """Normalized AM image. With max_bytes, evaluate in row blocks under that
+    memory ceiling, optionally into out (e.g. an np.memmap)."""
+    if max_bytes is not None:
+        return evaluate_tiled(grid, lambda xs, ys: am_points(pairs, xs, ys),
+                              max_bytes, out=out, normalize=True,
+                              bytes_per_point=160)
+    array = pair_array(pairs)
+    AM_total = array.am(lead_fields.unit_fields(array, grid, sigma_dc, eps_r))
+    return grid.scatter(AM_total / np.max(AM_total))
+
 
-        # Electrode pair opposite around circumference
-        e1 = np.array([Rn * np.cos(th), Rn * np.sin(th)])
-        e2 = np.array([Rn * np.cos(th + np.pi), Rn * np.sin(th + np.pi)])
+def am_points(pairs, X, Y):
+    array = pair_array(pairs)
+    return array.am(array.unit_fields(X, Y, sigma_dc, eps_r))
 
-        R1 = np.sqrt((X - e1[0]) ** 2 + (Y - e1[1]) ** 2)
-        R2 = np.sqrt((X - e2[0]) ** 2 + (Y - e2[1]) ** 2)
 
-        V1 = V_point(I1, R1, w1)
-        V2 = V_point(I2, R2, w2)
-        A1, A2 = np.abs(V1), np.abs(V2)
-        AM_pp = 2 * np.minimum(A1, A2)
-        AM_list.append(AM_pp)
+def am_sweep(pairs, carrier_pairs):
+    """(F, N, N) un-normalized AM images for F (f1, f2) carrier pairs, in one pass."""
+    AM = pair_array(pairs).am_sweep(X, Y, carrier_pairs, sigma_dc, eps_r)
+    return grid.scatter(AM)
 
-    AM_total = np.sum(AM_list, axis=0)
-    AM_total[mask] = np.nan
-    return AM_total / np.nanmax(AM_total)
+
+def pair_array(pairs):
+    th = np.deg2rad([p["angle"] for p in pairs])
+    total_I = total_I_global * np.array([p["weight"] for p in pairs])
+    steer = (np.array([p["steer"] for p in pairs]) + 1) / 2
+    I1 = steer * total_I
+    I2 = (1 - steer) * total_I
+
+    # Electrode pairs opposite around circumference, all evaluated at once
+    return ElectrodeArray.opposed_pairs(th, I1, I2, f1, f2, Rn)
 
 
 # === Initial plot ===
@@ -90,23 +95,23 @@ ax.axis("off")
 ax.set_title(f"Interferential Field (ΣI = {total_I_global*1e3:.1f} mA)")
 fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04, label="Normalized AM")
 
-# Nerve outline and fake fascicles
+# Nerve outline and fascicles, with their mean AM
 ax.add_patch(Circle((0, 0), Rn * 1e3, fill=False, color="white", lw=1.5))
-rng = np.random.default_rng(0)
-for _ in range(15):
-    cx, cy = rng.uniform(-0.6, 0.6, 2) * Rn * 1e3
-    w, h = rng.uniform(0.15, 0.35, 2) * Rn * 1e3
-    ax.add_patch(
-        Ellipse(
-            (cx, cy),
-            w,
-            h,
-            angle=rng.uniform(0, 180),
-            edgecolor="white",
-            facecolor="none",
-            lw=0.8,
-        )
-    )
+for f in fascicles:
+    ax.add_patch(f.patch(edgecolor="white", facecolor="none", lw=0.8))
+fascicle_labels = [
+    ax.text(f.x * 1e3, f.y * 1e3, "", color="white", fontsize=6, ha="center", va="center")
+    for f in fascicles
+]
+
+
+def show_fascicle_stats(AM):
+    mean = fascicle_map.mean(AM[grid.rows, grid.cols])
+    for text, m in zip(fascicle_labels, mean):
+        text.set_text(f"{m:.2f}")
+
+
+show_fascicle_stats(AM)
 
 # === Slider setup: 9 total (3 angle, 3 weight, 3 steer) ===
 sliders = []
@@ -136,6 +141,7 @@ def update(val):
     normalize_weights(pairs)
     AM_new = compute_am(pairs)
     im.set_data(AM_new)
+    show_fascicle_stats(AM_new)
     fig.canvas.draw_idle()
 
 
@@ -0,0 +1,168 @@
+import numpy as np
+
+from electrodes import ElectrodeArray
+from fields import NerveGrid
+
+# Slider ranges of FieldVisualizer
+WEIGHT_RANGE = (0.1, 3.0)
+STEER_RANGE = (-1.0, 1.0)
+
+
+# ----------------------------------------------------------------------------
+# Batched candidate evaluation
+# ----------------------------------------------------------------------------
+def steering_table(Rn, N, omegas, n_angles, sigma_dc, eps_r, dtype=np.float32):
+    '''Unit-current fields of a cuff electrode at n_angles positions, for each carrier.
+    -----
+    Parameters:
+    Rn : float
+        Nerve radius in meters (m).
+    N : int
+        Grid points per side of the evaluation grid.
+    omegas : array_like
+        Carrier angular frequencies (rad/s).
+    n_angles : int
+        Number of electrode angles (even, so that opposite electrodes are on the table).
+    sigma_dc, eps_r : float
+        Tissue parameters.
+    -------
+    Returns:
+    grid : NerveGrid
+        Evaluation grid.
+    U : np.ndarray
+        (len(omegas), n_angles, points) unit fields.
+    '''
+
+    grid = NerveGrid(Rn, N)
+    U = np.stack([
+        ElectrodeArray.ring(n_angles, Rn, 1.0, w / (2 * np.pi))
+        .unit_fields(grid.xs, grid.ys, sigma_dc, eps_r, dtype, grid.polar)
+        for w in omegas
+    ])
+    return grid, U
+
+
+def batch_am(U, f_index, angle_index, I1, I2):
+    '''AM (B, points) of B candidate configurations, gathered from a steering table.
+    -----
+    Parameters:
+    U : np.ndarray
+        (F, A, points) table from steering_table().
+    f_index : np.ndarray
+        (n_pairs, 2) carrier index of each pair's two electrodes.
+    angle_index : np.ndarray
+        (B, n_pairs) table angle of each pair's first electrode.
+    I1, I2 : np.ndarray
+        (B, n_pairs) electrode currents.
+    '''
+
+    n_angles = U.shape[1]
+    A1 = I1[..., None] * U[f_index[:, 0], angle_index]
+    A2 = I2[..., None] * U[f_index[:, 1], (angle_index + n_angles // 2) % n_angles]
+    return 2 * np.minimum(A1, A2).sum(axis=1)
+
+
+def focality_score(AM, target, off_weight=1.0):
+    '''Mean normalized AM on the target points minus off_weight times the mean elsewhere.'''
+    peak = AM.max(axis=1)
+    on_sum = AM[:, target].sum(axis=1)
+    n_on = np.count_nonzero(target)
+    on = on_sum / n_on
+    off = (AM.sum(axis=1) - on_sum) / max(AM.shape[1] - n_on, 1)
+    return np.divide(on - off_weight * off, peak, out=np.zeros_like(peak), where=peak > 0)
+
+
+# ----------------------------------------------------------------------------
+# Optimizer
+# ----------------------------------------------------------------------------
+def optimize_steering(pairs, target, total_I=2e-3, sigma_dc=0.3, eps_r=5000,
+                      radius=None, off_weight=1.0, N=64, n_angles=144,
+                      batch=256, elite=32, iterations=15, seed=0):
+    '''Find angle/weight/steer of every pair that focuses the AM on a target.
+
+    Candidates are evaluated in batches of `batch` configurations per
+    vectorized call against a precomputed steering table, and refined
+    around the best `elite` ones (cross-entropy search) for `iterations`
+    rounds.
+    -----
+    Parameters:
+    pairs : list of ElectrodePair
+        Current configuration; frequencies and Rn are kept, the rest is optimized.
+    target : tuple
+        (x, y) target in meters (m).
+    total_I : float
+        Total current in amperes (A).
+    sigma_dc, eps_r : float
+        Tissue parameters.
+    radius : float, optional
+        Treat every point within radius of target as target (e.g. a fascicle).
+        Defaults to the single nearest grid point.
+    off_weight : float
+        Penalty on the mean normalized AM outside the target.
+    N, n_angles : int
+        Resolution of the evaluation grid and of the electrode angle.
+    batch, elite, iterations : int
+        Search budget.
+    seed : int
+        Random seed, for reproducible results.
+    -------
+    Returns:
+    params : np.ndarray
+        (n_pairs, 3) best (angle [rad], weight, steer), as sweep.pairs_to_params.
+    score : float
+        focality_score of the best configuration.
+    '''
+
+    rng = np.random.default_rng(seed)
+    n = len(pairs)
+    omegas, f_index = np.unique([(p.w1, p.w2) for p in pairs], return_inverse=True)
+    f_index = f_index.reshape(n, 2)
+    grid, U = steering_table(pairs[0].Rn, N, omegas, n_angles, sigma_dc, eps_r)
+
+    d2 = (grid.xs - target[0])**2 + (grid.ys - target[1])**2
+    target_mask = d2 <= radius**2 if radius is not None else np.zeros(d2.size, bool)
+    target_mask[np.argmin(d2)] = True
+
+    step = 2 * np.pi / n_angles
+    angles = np.array([round((p.angle % (2 * np.pi)) / step) % n_angles for p in pairs])
+    weights = np.array([p.weight for p in pairs])
+    steers = np.array([p.steer for p in pairs])
+
+    def evaluate(a, w, s):
+        α = (s + 1) / 2
+        I_total = total_I * w
+        I1 = (α * I_total).astype(U.dtype)
+        I2 = ((1 - α) * I_total).astype(U.dtype)
+        return focality_score(batch_am(U, f_index, a, I1, I2),
+                              target_mask, off_weight)
+
+    # Initial population: current configuration plus uniform samples
+    a = rng.integers(0, n_angles, (batch, n))
+    w = rng.uniform(*WEIGHT_RANGE, (batch, n))
+    s = rng.uniform(*STEER_RANGE, (batch, n))
+    a[0], w[0], s[0] = angles, weights, steers
+
+    spread = np.array([n_angles / 8, 0.5, 0.4])
+    for _ in range(iterations):
+        order = np.argsort(evaluate(a, w, s))[::-1][:elite]
+        a, w, s = a[order], w[order], s[order]
+
+        pick = rng.integers(0, elite, batch - elite)
+        a_new = np.rint(a[pick] + rng.normal(0, spread[0], (batch - elite, n))).astype(int) % n_angles
+        w_new = np.clip(w[pick] + rng.normal(0, spread[1], (batch - elite, n)), *WEIGHT_RANGE)
+        s_new = np.clip(s[pick] + rng.normal(0, spread[2], (batch - elite, n)), *STEER_RANGE)
+        a = np.concatenate([a, a_new])
+        w = np.concatenate([w, w_new])
+        s = np.concatenate([s, s_new])
+        spread *= 0.7
+
+    scores = evaluate(a, w, s)
+    best = np.argmax(scores)
+    params = np.stack([a[best] * step, w[best], s[best]], axis=1)
+    return params, float(scores[best])
+
+
+def apply_params(pairs, params):
+    '''Write (angle [rad], weight, steer) rows back into the ElectrodePair objects.'''
+    for p, (angle, weight, steer) in zip(pairs, params):
+        p.angle, p.weight, p.steer = angle, weight, steer
@@ -0,0 +1,119 @@
+import os
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from sweep import METRICS_DTYPE, param_grid, sweep
+
+
+class SteeringIndex:
+    '''Inverse lookup from a desired AM location to stimulation parameters.
+
+    Built offline by sweeping a dense (angle, weight, steer) lattice and
+    recording where each setting puts its AM peak or centroid. Those
+    locations go into a KD-tree, so a query is a tree lookup.
+
+    A pair at (angle, steer) swaps its two contacts when moved to
+    (angle + pi, -steer), which is the same setting, so every pair is
+    stored canonically with its angle in [0, pi). Settings without any AM
+    (NaN locations, see sweep.focality) cannot be reached and are dropped.
+    -----
+    Parameters:
+    params : np.ndarray
+        (C, n_pairs, 3) lattice of (angle [rad], weight, steer).
+    metrics : np.ndarray
+        (C,) sweep() table for params.
+    key : str
+        "peak" or "centroid": which AM location is indexed.
+    template : np.ndarray, optional
+        (n_pairs, 3) (f1, f2, Rn) the lattice was computed with, kept for reference.
+    '''
+
+    def __init__(self, params, metrics, key="centroid", template=None):
+        params = canonical(np.asarray(params, dtype=float))
+        metrics = np.asarray(metrics, dtype=METRICS_DTYPE)
+        points = np.column_stack([metrics[f"{key}_x"], metrics[f"{key}_y"]])
+        finite = np.isfinite(points).all(axis=1)
+        self.params = params[finite]
+        self.metrics = metrics[finite]
+        self.points = points[finite]
+        self.key = key
+        self.template = template
+        self.tree = cKDTree(self.points)
+
+    @classmethod
+    def build(cls, template, grid, angles_deg, weights, steers, key="centroid", **sweep_kwargs):
+        '''Sweep the lattice for the ElectrodePair list template and index the result.'''
+        params = param_grid(angles_deg, weights, steers, len(template))
+        metrics = sweep(params, grid, template=template, **sweep_kwargs)
+        info = np.array([(p.w1 / (2 * np.pi), p.w2 / (2 * np.pi), p.Rn) for p in template])
+        return cls(params, metrics, key=key, template=info)
+
+    def save(self, path):
+        np.savez(_npz(path), params=self.params, metrics=self.metrics, key=self.key,
+                 template=np.array([]) if self.template is None else self.template)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(_npz(path)) as data:
+            template = data["template"]
+            return cls(data["params"], data["metrics"], key=str(data["key"]),
+                       template=template if template.size else None)
+
+    def query(self, xy, k=1):
+        '''Parameters for a desired AM location (or an (M, 2) batch of them).
+        -----
+        Parameters:
+        xy : array_like
+            Target (x, y) in meters (m), or an (M, 2) array of targets.
+        k : int
+            1 returns the nearest lattice setting; k > 1 interpolates the
+            k nearest by inverse distance (angles on the circle). Each
+            neighbour's pairs are first taken in the (angle, steer) or
+            (angle + pi, -steer) form closest to the nearest neighbour, so
+            equivalent settings are not averaged against each other.
+        -------
+        Returns:
+        params : np.ndarray
+            (n_pairs, 3), or (M, n_pairs, 3) for a batch.
+        distance : float or np.ndarray
+            Distance from the target to the nearest indexed location.
+        '''
+
+        xy = np.asarray(xy, dtype=float)
+        d, i = self.tree.query(xy, k=k)
+        if k == 1:
+            return self.params[i], d
+
+        d, i = np.atleast_2d(d), np.atleast_2d(i)
+        exact = d[:, :1] == 0
+        w = np.where(exact, np.arange(k) == 0, 1 / np.where(d == 0, 1, d))
+        w = w / w.sum(axis=1, keepdims=True)
+
+        near = self.params[i].copy()  # (M, k, n_pairs, 3)
+        flip = np.abs(np.angle(np.exp(1j * (near[..., 0] - near[:, :1, :, 0])))) > np.pi / 2
+        near[..., 0] += np.pi * flip
+        near[..., 2] *= np.where(flip, -1, 1)
+        w = w[:, :, None]
+        angle = np.arctan2((w * np.sin(near[..., 0])).sum(axis=1),
+                           (w * np.cos(near[..., 0])).sum(axis=1)) % (2 * np.pi)
+        rest = (w[..., None] * near[..., 1:]).sum(axis=1)
+        params = canonical(np.concatenate([angle[..., None], rest], axis=-1))
+        if xy.ndim == 1:
+            return params[0], d[0, 0]
+        return params, d[:, 0]
+
+
+def canonical(params) -> np.ndarray:
+    '''(..., n_pairs, 3) settings with every pair's angle in [0, pi), flipping steer where moved.'''
+    params = np.array(params, dtype=float)
+    angle = np.mod(params[..., 0], 2 * np.pi)
+    flip = angle >= np.pi
+    params[..., 0] = np.where(flip, angle - np.pi, angle)
+    params[..., 2] = np.where(flip, -params[..., 2], params[..., 2])
+    return params
+
+
+def _npz(path) -> str:
+    path = os.fspath(path)
+    return path if path.endswith(".npz") else path + ".npz"
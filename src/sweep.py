@@ -0,0 +1,178 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from electrodes import ElectrodeArray, ElectrodePair
+
+# One row per configuration: focality metrics only, no images
+METRICS_DTYPE = np.dtype([
+    ("config", np.int64),
+    ("peak_x", np.float32),
+    ("peak_y", np.float32),
+    ("peak", np.float32),
+    ("fraction", np.float32),
+    ("centroid_x", np.float32),
+    ("centroid_y", np.float32),
+])
+
+_worker = {}
+
+
+# ----------------------------------------------------------------------------
+# Configurations
+# ----------------------------------------------------------------------------
+def pairs_to_params(pairs) -> np.ndarray:
+    '''(n_pairs, 3) array of (angle [rad], weight, steer) for a list of ElectrodePair.'''
+    return np.array([(p.angle, p.weight, p.steer) for p in pairs], dtype=float)
+
+
+def param_grid(angles_deg, weights, steers, n_pairs: int) -> np.ndarray:
+    '''Every combination of per-pair angle/weight/steer values.
+    -----
+    Parameters:
+    angles_deg, weights, steers : array_like
+        Values to try for each pair.
+    n_pairs : int
+        Number of electrode pairs per configuration.
+    -------
+    Returns:
+    np.ndarray
+        (C, n_pairs, 3) array of (angle [rad], weight, steer).
+    '''
+
+    per_pair = np.array(list(itertools.product(np.deg2rad(angles_deg), weights, steers)))
+    index = np.array(list(itertools.product(range(len(per_pair)), repeat=n_pairs)))
+    return per_pair[index]
+
+
+def params_to_array(params, template, total_I) -> ElectrodeArray:
+    '''ElectrodeArray for one (n_pairs, 3) configuration; f1, f2 and Rn come from template pairs.'''
+    angle, weight, steer = params.T
+    α = (steer + 1) / 2
+    I_total = total_I * weight
+    f1 = np.array([p.w1 for p in template]) / (2 * np.pi)
+    f2 = np.array([p.w2 for p in template]) / (2 * np.pi)
+    Rn = np.array([p.Rn for p in template])
+    return ElectrodeArray.opposed_pairs(angle, α * I_total, (1 - α) * I_total, f1, f2, Rn)
+
+
+# ----------------------------------------------------------------------------
+# Metrics
+# ----------------------------------------------------------------------------
+def focality(AM, xs, ys, threshold):
+    '''Peak location, fraction of the disk above threshold * peak, and AM-weighted centroid.
+
+    An all-zero AM (no interference, e.g. steer = +-1 on every pair puts all
+    current on one carrier) has no peak or centroid: its row is NaN
+    locations with peak and fraction 0.
+    '''
+    if not np.any(AM > 0):
+        return (np.nan, np.nan, 0.0, 0.0, np.nan, np.nan)
+    i = np.argmax(AM)
+    peak = AM[i]
+    w = AM.sum()
+    return (
+        xs[i], ys[i], peak,
+        np.count_nonzero(AM >= threshold * peak) / AM.size,
+        (AM @ xs) / w, (AM @ ys) / w,
+    )
+
+
+def _init_worker(shm_name, n_points, template, total_I, sigma_dc, eps_r, threshold, dtype):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    coords = np.ndarray((2, n_points), dtype=np.float64, buffer=shm.buf)
+    _worker.update(shm=shm, xs=coords[0], ys=coords[1], template=template,
+                   total_I=total_I, sigma_dc=sigma_dc, eps_r=eps_r,
+                   threshold=threshold, dtype=dtype)
+
+
+def _evaluate_chunk(start, params):
+    w = _worker
+    rows = np.zeros(len(params), dtype=METRICS_DTYPE)
+    for k, config in enumerate(params):
+        array = params_to_array(config, w["template"], w["total_I"])
+        AM = array.am(array.unit_fields(w["xs"], w["ys"], w["sigma_dc"], w["eps_r"], w["dtype"]))
+        rows[k] = (start + k,) + focality(AM, w["xs"], w["ys"], w["threshold"])
+    return rows
+
+
+# ----------------------------------------------------------------------------
+# Sweep
+# ----------------------------------------------------------------------------
+def sweep(configs, grid, template=None, total_I=2e-3, sigma_dc=0.3, eps_r=5000,
+          threshold=0.5, processes=None, chunksize=64, dtype=np.float32) -> np.ndarray:
+    '''Evaluate many electrode configurations across a process pool.
+
+    The interior coordinates of grid are placed in shared memory once, and
+    each worker returns one metrics row per configuration.
+    -----
+    Parameters:
+    configs : list or np.ndarray
+        List of ElectrodePair lists, or a (C, n_pairs, 3) array of
+        (angle [rad], weight, steer) such as param_grid() returns.
+    grid : NerveGrid
+        Cross-section grid.
+    template : list of ElectrodePair, optional
+        Supplies f1, f2 and Rn of each pair. Defaults to the first
+        configuration when configs are ElectrodePair lists, else to
+        ElectrodePair defaults with Rn = grid.Rn.
+    total_I : float
+        Total current in amperes (A), shared as in compute_field.
+    sigma_dc, eps_r : float
+        Tissue parameters.
+    threshold : float
+        Fraction of the peak AM counted as "activated".
+    processes : int, optional
+        Worker count (defaults to os.cpu_count()); 1 runs in-process.
+    chunksize : int
+        Configurations per task.
+    dtype : np.dtype
+        Field dtype.
+    -------
+    Returns:
+    np.ndarray
+        Structured array with METRICS_DTYPE, one row per configuration.
+        Configurations without any AM have NaN locations (see focality).
+    '''
+
+    if len(configs) == 0:
+        return np.zeros(0, dtype=METRICS_DTYPE)
+    if not isinstance(configs, np.ndarray):
+        if template is None:
+            template = configs[0]
+        configs = np.array([pairs_to_params(c) for c in configs])
+    configs = np.asarray(configs, dtype=float)
+    if template is None:
+        template = [ElectrodePair(0, None, None, Rn=grid.Rn) for _ in range(configs.shape[1])]
+
+    n_points = len(grid)
+    shm = shared_memory.SharedMemory(create=True, size=2 * n_points * 8)
+    try:
+        coords = np.ndarray((2, n_points), dtype=np.float64, buffer=shm.buf)
+        coords[0] = grid.xs
+        coords[1] = grid.ys
+        initargs = (shm.name, n_points, template, total_I, sigma_dc, eps_r, threshold, dtype)
+        starts = range(0, len(configs), chunksize)
+
+        if processes == 1:
+            _init_worker(*initargs)
+            try:
+                chunks = [_evaluate_chunk(s, configs[s:s + chunksize]) for s in starts]
+            finally:
+                attached = _worker.pop("shm")
+                _worker.clear()
+                attached.close()
+        else:
+            with ProcessPoolExecutor(processes or os.cpu_count(),
+                                     initializer=_init_worker, initargs=initargs) as pool:
+                chunks = list(pool.map(_evaluate_chunk, starts,
+                                       [configs[s:s + chunksize] for s in starts]))
+        del coords
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return np.concatenate(chunks)
@@ -0,0 +1,107 @@
+import numpy as np
+
+from fields import eps0
+
+# Four-pole Cole-Cole parameters from Gabriel, Lau & Gabriel (1996), Phys. Med. Biol. 41, 2271.
+# eps_inf, poles (delta_eps, tau in s, alpha) and ionic conductivity sigma_i in S/m.
+# "Extracel" is body fluid, "Connective" is tendon.
+GABRIEL_1996 = {
+
+    "Extracel": {"eps_inf": 4.0, "sigma_i": 1.5,
+                 "poles": [(65.0, 7.234e-12, 0.0), (40.0, 13.263e-9, 0.0),
+                           (0.0, 159.155e-6, 0.0), (0.0, 15.915e-3, 0.0)]},
+
+    "Nerve": {"eps_inf": 4.0, "sigma_i": 0.006,
+              "poles": [(26.0, 7.958e-12, 0.1), (500.0, 106.103e-9, 0.15),
+                        (7.0e4, 15.915e-6, 0.2), (4.0e7, 15.915e-3, 0.0)]},
+
+    "Muscle": {"eps_inf": 4.0, "sigma_i": 0.2,
+               "poles": [(50.0, 7.234e-12, 0.1), (7000.0, 353.678e-9, 0.1),
+                         (1.2e6, 318.310e-6, 0.1), (2.5e7, 2.274e-3, 0.0)]},
+
+    "Fat": {"eps_inf": 2.5, "sigma_i": 0.01,
+            "poles": [(3.0, 7.958e-12, 0.2), (15.0, 15.915e-9, 0.1),
+                      (3.3e4, 159.155e-6, 0.05), (1.0e7, 7.958e-3, 0.01)]},
+
+    "Skin": {"eps_inf": 4.0, "sigma_i": 0.0002,
+             "poles": [(32.0, 7.234e-12, 0.0), (1100.0, 32.481e-9, 0.2),
+                       (0.0, 159.155e-6, 0.2), (0.0, 15.915e-3, 0.2)]},
+
+    "Connective": {"eps_inf": 4.0, "sigma_i": 0.25,
+                   "poles": [(42.0, 12.732e-12, 0.1), (60.0, 6.366e-9, 0.1),
+                             (6.0e4, 318.310e-6, 0.22), (2.0e7, 1.326e-3, 0.0)]},
+}
+
+
+def cole_cole(omega, eps_inf, poles, sigma_i) -> np.ndarray:
+    '''Complex conductivity sigma* = sigma_i + j omega eps0 eps*(omega) of a multi-pole Cole-Cole tissue.
+    -----
+    Parameters:
+    omega : np.ndarray
+        Angular frequencies in rad/s.
+    eps_inf : float
+        High-frequency relative permittivity.
+    poles : list
+        (delta_eps, tau, alpha) of every dispersion, tau in seconds.
+    sigma_i : float
+        Static ionic conductivity in S/m.
+    -------
+    Returns:
+    np.ndarray
+        Complex conductivity in S/m, same shape as omega.
+    '''
+
+    jw = 1j * np.asarray(omega, dtype=float)
+    eps = np.full(jw.shape, eps_inf, dtype=complex)
+    for delta, tau, alpha in poles:
+        eps += delta / (1 + (jw * tau) ** (1 - alpha))
+    return sigma_i + jw * eps0 * eps
+
+
+class Tissue:
+    '''Dispersive tissue with its complex conductivity tabulated once over frequency.
+
+    The Cole-Cole formula is evaluated on a log-spaced frequency table at
+    construction; calls interpolate that table (real and imaginary parts,
+    linear in log f), so sweeps over many carriers never re-evaluate the
+    dispersion. Instances are callables omega -> sigma*, the form FDSolver
+    takes for its tissues and fields.sigma_abs accepts in place of sigma_dc.
+    -----
+    Parameters:
+    name : str
+        Key of GABRIEL_1996.
+    f_min, f_max : float
+        Tabulated frequency range in Hz (clamped outside it).
+    n : int
+        Number of table entries.
+    '''
+
+    def __init__(self, name: str, f_min: float = 1.0, f_max: float = 1e8, n: int = 4096):
+        self.name = name
+        self.params = GABRIEL_1996[name]
+        self.f = np.geomspace(f_min, f_max, n)
+        self.log_f = np.log(self.f)
+        self.table = cole_cole(2 * np.pi * self.f, **self.params)
+        self.key = (name, f_min, f_max, n)
+
+    def __repr__(self):
+        return f"Tissue({self.name!r})"
+
+    def __call__(self, omega) -> np.ndarray:
+        '''Interpolated complex conductivity at angular frequency omega (rad/s).'''
+        log_f = np.log(np.maximum(np.asarray(omega, dtype=float) / (2 * np.pi), self.f[0]))
+        return (np.interp(log_f, self.log_f, self.table.real)
+                + 1j * np.interp(log_f, self.log_f, self.table.imag))
+
+    def exact(self, omega) -> np.ndarray:
+        '''Complex conductivity from the Cole-Cole formula itself.'''
+        return cole_cole(omega, **self.params)
+
+    def sigma_eps(self, f):
+        '''Equivalent (sigma, eps_r) at frequency f (Hz), e.g. for the constant-tissue code paths.'''
+        omega = 2 * np.pi * np.asarray(f, dtype=float)
+        sig = self(omega)
+        return sig.real, sig.imag / (omega * eps0)
+
+
+tissues = {name: Tissue(name) for name in GABRIEL_1996}
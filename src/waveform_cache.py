@@ -0,0 +1,71 @@
+import hashlib
+
+import numpy as np
+
+import modelling
+import waveforms
+from cache import LRUCache
+
+
+class WaveformCache:
+    '''Memoized waveform generators, keyed on their parameters.
+
+    electrode_waveform, multi_electrode_waveform and gen_signals are pure
+    functions of their arguments, so a repeated call (the same carrier in
+    another pair, a notebook cell run again) returns the stored result
+    instead of recomputing it. Results are made read-only before they are
+    stored, so a caller cannot corrupt what later calls receive; copy them
+    to modify. Array arguments are keyed by value (gen_signals' time vector
+    by a hash of its bytes).
+    -----
+    Parameters:
+    max_bytes : int
+        Memory budget for the stored results (least recently used are evicted).
+    '''
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self._results = LRUCache(max_bytes)
+
+    @staticmethod
+    def _param(value):
+        if np.isscalar(value):
+            return float(value)
+        value = np.asarray(value, dtype=float)
+        return (value.shape, tuple(value.ravel().tolist()))
+
+    @staticmethod
+    def _array_key(value) -> tuple:
+        value = np.ascontiguousarray(value)
+        return (value.shape, value.dtype.str, hashlib.sha1(value.tobytes()).hexdigest())
+
+    def _call(self, key, compute):
+        result = self._results.get(key)
+        if result is None:
+            result = compute()
+            for array in (result if isinstance(result, tuple) else (result,)):
+                array.setflags(write=False)
+            self._results.put(key, result)
+        return result
+
+    def electrode_waveform(self, A, TD, PRF, BD, carrier_f, f_s, start_t=0):
+        '''Cached waveforms.electrode_waveform; returns read-only (signal, t).'''
+        key = ("electrode_waveform",) + tuple(map(self._param, (A, TD, PRF, BD, carrier_f, f_s, start_t)))
+        return self._call(key, lambda: waveforms.electrode_waveform(A, TD, PRF, BD, carrier_f, f_s, start_t))
+
+    def multi_electrode_waveform(self, A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t=0):
+        '''Cached waveforms.multi_electrode_waveform; returns read-only (signals, t).'''
+        key = (("multi_electrode_waveform", int(num_electrodes))
+               + tuple(map(self._param, (A, TD, PRF, BD, carrier_f, f_s, start_t))))
+        return self._call(key, lambda: waveforms.multi_electrode_waveform(
+            A, TD, PRF, BD, carrier_f, f_s, num_electrodes, start_t))
+
+    def gen_signals(self, freqs, amps, t) -> np.ndarray:
+        '''Cached modelling.gen_signals; returns a read-only array.'''
+        key = ("gen_signals", self._param(freqs), self._param(amps), self._array_key(t))
+        return self._call(key, lambda: np.asarray(modelling.gen_signals(freqs, amps, t)))
+
+    def clear(self):
+        self._results.clear()
+
+    def stats(self) -> dict:
+        return self._results.stats()
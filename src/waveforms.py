@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Tuple
+from typing import Iterator, Tuple
 def electrode_waveform(A: float, TD: float, PRF: float, BD: float, carrier_f: float, f_s: float, start_t: float = 0) -> Tuple[np.array, np.array]:
     """
     Generate a simple sine wave electrode waveform.
@@ -25,9 +25,26 @@ def electrode_waveform(A: float, TD: float, PRF: float, BD: float, carrier_f: fl
     
     return signal, t
 
+def _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes):
+    """Per-electrode parameter arrays (floats are repeated for every electrode)."""
+    params = {
+        'A': A, 'TD': TD, 'PRF': PRF, 'BD': BD, 
+        'carrier_f': carrier_f, 'f_s': f_s
+    }
+    
+    for key, value in params.items():
+        if isinstance(value, (int, float)):
+            params[key] = np.full(num_electrodes, value)
+        else:
+            params[key] = np.array(value)
+            if len(params[key]) != num_electrodes:
+                raise ValueError(f"{key} array length must match num_electrodes")
+    return params
+
 # TODO review and optimize
 def multi_electrode_waveform(
-    A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t: float = 0
+    A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t: float = 0,
+    multi_rate: bool = False
 ) -> Tuple[np.array, np.array]:
     """
     Generate electrode waveforms for multiple electrodes.
@@ -44,24 +61,19 @@ def multi_electrode_waveform(
     f_s            : Sampling frequency in Hz. Float or array of length num_electrodes.
     num_electrodes : Number of electrodes.
     start_t        : Start time in seconds.
+    multi_rate     : Generate every electrode at its own f_s and TD and return a
+                     MultiRateWaveform (see multi_rate_waveform) instead.
     
     Returns:
-    signals (np.array) : Array of shape (N, num_electrodes) with electrode waveforms.
+    signals (np.array) : Array of shape (N, num_electrodes) with electrode waveforms,
+                         all at max(f_s) for max(TD).
     t (np.array)       : Time array of shape (N, 1).
     """
+    if multi_rate:
+        return multi_rate_waveform(A, TD, PRF, BD, carrier_f, f_s, num_electrodes, start_t)
+
     # Convert all parameters to arrays
-    params = {
-        'A': A, 'TD': TD, 'PRF': PRF, 'BD': BD, 
-        'carrier_f': carrier_f, 'f_s': f_s
-    }
-    
-    for key, value in params.items():
-        if isinstance(value, (int, float)):
-            params[key] = np.full(num_electrodes, value)
-        else:
-            params[key] = np.array(value)
-            if len(params[key]) != num_electrodes:
-                raise ValueError(f"{key} array length must match num_electrodes")
+    params = _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes)
     
     # Generate waveforms for each electrode
     signals = []
@@ -82,4 +94,465 @@ def multi_electrode_waveform(
     signals = params['A'].reshape(1, -1) * np.sin(
         2 * np.pi * params['carrier_f'].reshape(1, -1) * t_local
     ) * bursts  # (N, num_electrodes)
-    return signals, t
\ No newline at end of file
+    return signals, t
+
+
+# ----------------------------------------------------------------------------
+# Streaming (chunked) generation
+# ----------------------------------------------------------------------------
+def time_chunks(start_t: float, TD: float, N: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """
+    Yield the samples of np.linspace(start_t, start_t + TD, N) in (n, 1) chunks.
+
+    Every sample is computed the way np.linspace computes it
+    (index * step + start, last sample set to stop), so concatenating the
+    chunks gives exactly the dense time vector.
+    """
+    stop = start_t + TD
+    step = (stop - start_t) / (N - 1) if N > 1 else 0.0
+    for i0 in range(0, N, chunk_size):
+        i1 = min(i0 + chunk_size, N)
+        t = np.arange(i0, i1, dtype=float).reshape(-1, 1)
+        t *= step
+        t += start_t
+        if i1 == N and N > 1:
+            t[-1] = stop
+        yield t
+
+
+def electrode_waveform_chunks(A: float, TD: float, PRF: float, BD: float, carrier_f: float, f_s: float, start_t: float = 0, chunk_size: int = 2**16) -> Iterator[Tuple[np.array, np.array]]:
+    """
+    Streaming version of electrode_waveform: yields (signal, t) chunks of at most chunk_size samples.
+
+    Samples depend only on absolute time, so the phase is continuous across
+    chunk boundaries and the concatenated chunks equal the dense output,
+    while memory stays bounded by chunk_size for any duration.
+
+    Parameters:
+    A, TD, PRF, BD, carrier_f, f_s, start_t : as in electrode_waveform.
+    chunk_size (int)   : Samples per chunk.
+
+    Yields:
+    signal (np.array)  : (n, 1) electrode waveform chunk.
+    t (np.array)       : (n, 1) corresponding time values.
+    """
+    PRP = 1 / PRF  # s, Pulse repetition period
+    N = int(TD * f_s)  # Total number of samples
+    for t in time_chunks(start_t, TD, N, chunk_size):
+        t_local = t % PRP
+        signal = A * np.sin(2 * np.pi * carrier_f * t_local)
+        yield signal, t
+
+
+def multi_electrode_waveform_chunks(
+    A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t: float = 0,
+    chunk_size: int = 2**16
+) -> Iterator[Tuple[np.array, np.array]]:
+    """
+    Streaming version of multi_electrode_waveform: yields (signals, t) chunks.
+
+    Parameters are as in multi_electrode_waveform, plus chunk_size (samples
+    per chunk). Concatenating the chunks gives exactly the dense output; only
+    one chunk of t, t_local, bursts and signals exists at a time.
+
+    Yields:
+    signals (np.array) : (n, num_electrodes) chunk of electrode waveforms.
+    t (np.array)       : (n, 1) corresponding time values.
+    """
+    params = _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes)
+    PRP = (1 / params['PRF']).reshape(1, -1)
+    BD = params['BD'].reshape(1, -1)
+    A = params['A'].reshape(1, -1)
+    w = 2 * np.pi * params['carrier_f'].reshape(1, -1)
+    max_TD = np.max(params['TD'])
+    N = int(max_TD * np.max(params['f_s']))
+
+    for t in time_chunks(start_t, max_TD, N, chunk_size):
+        t_local = t % PRP
+        bursts = t_local < BD
+        yield A * np.sin(w * t_local) * bursts, t
+
+
+# ----------------------------------------------------------------------------
+# Integer-sample-phase synthesis
+# ----------------------------------------------------------------------------
+def _period_samples(PRF, f_s, start_t):
+    """Samples per pulse period (int array) and the start sample index (int), or None if not whole numbers."""
+    P = f_s / np.asarray(PRF, dtype=float)
+    s0 = start_t * f_s
+    P_int = np.round(P).astype(np.int64)
+    if np.all(np.abs(P - P_int) <= 1e-9 * P) and abs(s0 - round(s0)) <= 1e-9 * max(abs(s0), 1):
+        return P_int, int(round(s0))
+    return None
+
+
+def burst_period(A, PRF, BD, carrier_f, f_s, num_electrodes: int) -> np.ndarray:
+    """
+    One repetition period of every electrode, sampled at integer indices.
+
+    Sample k of electrode e is A sin(2 pi f k / f_s) while k / f_s < BD, and
+    0 for the rest of the period. The table spans the least common multiple
+    of the per-electrode periods, so it repeats as a whole.
+
+    Parameters:
+    A, PRF, BD, carrier_f : as in multi_electrode_waveform (float or per electrode).
+    f_s (float)           : Sampling frequency in Hz (one rate for all electrodes).
+    num_electrodes (int)  : Number of electrodes.
+
+    Returns:
+    table (np.array)      : (L, num_electrodes) period table.
+
+    Raises:
+    ValueError            : if a pulse period is not a whole number of samples.
+    """
+    params = _electrode_params(A, 1.0, PRF, BD, carrier_f, f_s, num_electrodes)
+    commensurate = _period_samples(params['PRF'], f_s, 0)
+    if commensurate is None:
+        raise ValueError("pulse periods must be whole numbers of samples (f_s / PRF integer)")
+    P = commensurate[0]
+    L = int(np.lcm.reduce(P))
+
+    table = np.empty((L, num_electrodes))
+    for e in range(num_electrodes):
+        k = np.arange(min(P[e], int(np.ceil(params['BD'][e] * f_s))))
+        template = np.zeros(P[e])
+        template[:len(k)] = params['A'][e] * np.sin(2 * np.pi * params['carrier_f'][e] * k / f_s)
+        table[:, e] = np.tile(template, L // P[e])
+    return table
+
+
+def tiled_waveform(
+    A, TD, PRF, BD, carrier_f, f_s: float, num_electrodes: int, start_t: float = 0,
+    view: bool = False
+):
+    """
+    Burst-gated multi-electrode waveforms on the integer sample grid t = k / f_s.
+
+    When every pulse period (and start_t) is a whole number of samples and
+    the output spans at least one common period, that period is computed
+    with burst_period and tiled, so no sin or % is
+    evaluated per sample. Otherwise the phase comes from integer sample
+    indices (k - floor(k / P) P with P = f_s / PRF), so it does not drift
+    with the absolute time, and sin is only evaluated inside bursts.
+
+    Unlike multi_electrode_waveform, which spaces its N samples by
+    TD / (N - 1) (np.linspace), samples sit exactly at k / f_s, so bursts
+    start on the same sample of every period.
+
+    Parameters:
+    A, TD, PRF, BD, carrier_f, num_electrodes, start_t : as in multi_electrode_waveform.
+    f_s (float)        : Sampling frequency in Hz (one rate for all electrodes).
+    view (bool)        : Return (signals, t, offset) with signals as periods: in the
+                         commensurate case a zero-copy view of the period table
+                         (always tiled), otherwise the dense samples as one period.
+
+    Returns:
+    signals (np.array) : (N, num_electrodes) waveforms, N = int(max(TD) * f_s).
+                         With view=True, a read-only (periods, L, num_electrodes)
+                         array: a strided view of the period table, or
+                         (1, N, num_electrodes) when PRF is not commensurate with
+                         f_s. Either way the samples are
+                         view.reshape(-1, num_electrodes)[offset:offset + N].
+    t (np.array)       : (N, 1) time values.
+    offset (int)       : only with view=True, sample of the first period where t[0]
+                         falls (0 for the dense samples).
+    """
+    params = _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes)
+    N = int(np.max(params['TD']) * f_s)
+    commensurate = _period_samples(params['PRF'], f_s, start_t)
+    if commensurate is not None and np.lcm.reduce(commensurate[0]) > N and not view:
+        commensurate = None  # shorter than one period: tiling saves nothing
+
+    if commensurate is not None:
+        P, s0 = commensurate
+        table = burst_period(params['A'], params['PRF'], params['BD'], params['carrier_f'],
+                             f_s, num_electrodes)
+        L = len(table)
+        offset = s0 % L
+        t = ((s0 + np.arange(N)) / f_s).reshape(-1, 1)
+        periods = -(-(offset + N) // L)
+        if view:
+            strided = np.lib.stride_tricks.as_strided(
+                table, shape=(periods, L, num_electrodes),
+                strides=(0,) + table.strides, writeable=False)
+            return strided, t, offset
+        return np.tile(table, (periods, 1))[offset:offset + N], t
+
+    # Drift-free indexed path: phase from the sample index, not from t % PRP
+    k = np.arange(N, dtype=float) + start_t * f_s  # absolute sample index
+    t = (k / f_s).reshape(-1, 1)
+    signals = np.zeros((N, num_electrodes))
+    for e in range(num_electrodes):
+        P = f_s / params['PRF'][e]
+        local = k - np.floor(k / P) * P  # samples since the last pulse onset
+        on = local < params['BD'][e] * f_s
+        signals[on, e] = params['A'][e] * np.sin(2 * np.pi * params['carrier_f'][e] * local[on] / f_s)
+    if view:
+        # Same layout as the tiled view: one "period" holding all N samples
+        signals = signals[None]
+        signals.setflags(write=False)
+        return signals, t, 0
+    return signals, t
+
+
+# ----------------------------------------------------------------------------
+# Burst-sparse representation
+# ----------------------------------------------------------------------------
+class BurstWaveform:
+    """
+    Burst-gated electrode waveforms stored as burst templates plus burst onsets.
+
+    Nothing outside the bursts is stored, so memory and work scale with the
+    burst samples (under 1% of the samples at BD = 250 us, PRF = 33 Hz),
+    not with the duration. Any window is materialized on demand, and RMS,
+    charge and energy are computed from the templates.
+
+    Each electrode keeps the templates A sin(w k dt) and A cos(w k dt),
+    k < BD / dt. A burst starting phi seconds before its first sample is
+    cos(w phi) * sin_template + sin(w phi) * cos_template, so only two
+    numbers are stored per burst, no sin is evaluated per sample, and
+    windows match multi_electrode_waveform to rounding.
+
+    Parameters:
+    sin_templates (list) : (L_e,) A sin(w k dt) template of every electrode.
+    cos_templates (list) : (L_e,) A cos(w k dt) template of every electrode.
+    onsets (list)        : (B_e,) first sample index of every burst (may be negative).
+    lengths (list)       : (B_e,) samples in every burst (L_e or L_e - 1, depending on phase).
+    rotations (list)     : (B_e, 2) (cos(w phi), sin(w phi)) of every burst.
+    N (int)              : Total number of samples.
+    dt (float)           : Sample period in seconds.
+    start_t (float)      : Time of sample 0 in seconds.
+    """
+
+    def __init__(self, sin_templates, cos_templates, onsets, lengths, rotations, N: int,
+                 dt: float, start_t: float = 0):
+        self.sin_templates = [np.asarray(x, dtype=float) for x in sin_templates]
+        self.cos_templates = [np.asarray(x, dtype=float) for x in cos_templates]
+        self.onsets = [np.asarray(x, dtype=np.int64) for x in onsets]
+        self.lengths = [np.asarray(x, dtype=np.int64) for x in lengths]
+        self.rotations = [np.asarray(x, dtype=float).reshape(-1, 2) for x in rotations]
+        self.N = N
+        self.dt = dt
+        self.start_t = start_t
+
+    @classmethod
+    def from_params(cls, A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t: float = 0):
+        """Compact equivalent of multi_electrode_waveform (same parameters, same time base)."""
+        params = _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes)
+        max_TD = np.max(params['TD'])
+        N = int(max_TD * np.max(params['f_s']))
+        dt = max_TD / (N - 1) if N > 1 else max_TD  # np.linspace step
+
+        sin_templates, cos_templates, onsets, lengths, rotations = [], [], [], [], []
+        for A_e, PRF_e, BD_e, f_e in zip(params['A'], params['PRF'], params['BD'], params['carrier_f']):
+            PRP = 1 / PRF_e
+            w = 2 * np.pi * f_e
+            k = np.arange(int(np.ceil(BD_e / dt)))
+            sin_templates.append(A_e * np.sin(w * k * dt))
+            cos_templates.append(A_e * np.cos(w * k * dt))
+
+            # Pulses whose burst reaches [start_t, start_t + max_TD]
+            n = np.arange(np.floor(start_t / PRP), np.floor((start_t + max_TD) / PRP) + 1)
+            onset = np.ceil((n * PRP - start_t) / dt - 1e-9).astype(np.int64)
+            phi = np.maximum(start_t + onset * dt - n * PRP, 0)  # burst phase at its first sample
+            onsets.append(onset)
+            lengths.append(np.minimum(np.ceil((BD_e - phi) / dt - 1e-9), len(k)).astype(np.int64))
+            rotations.append(np.stack([np.cos(w * phi), np.sin(w * phi)], axis=1))
+        return cls(sin_templates, cos_templates, onsets, lengths, rotations, N, dt, start_t)
+
+    def __len__(self):
+        return self.N
+
+    @property
+    def num_electrodes(self) -> int:
+        return len(self.sin_templates)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = self.sin_templates + self.cos_templates + self.onsets + self.lengths + self.rotations
+        return sum(x.nbytes for x in arrays)
+
+    def _played(self, e, i0=0, i1=None):
+        """Per burst of electrode e, the template range [k0, k1) falling in samples i0:i1."""
+        i1 = self.N if i1 is None else min(i1, self.N)
+        k0 = np.clip(i0 - self.onsets[e], 0, self.lengths[e])
+        k1 = np.clip(i1 - self.onsets[e], k0, self.lengths[e])
+        return k0, k1
+
+    def _burst_values(self, e, i0=0, i1=None):
+        """(sample indices, values) of electrode e's burst samples within i0:i1."""
+        k0, k1 = self._played(e, i0, i1)
+        hit = k1 > k0
+        k = np.arange(len(self.sin_templates[e]))
+        keep = (k >= k0[hit, None]) & (k < k1[hit, None])  # (bursts, L)
+        c, s = self.rotations[e][hit].T
+        values = c[:, None] * self.sin_templates[e] + s[:, None] * self.cos_templates[e]
+        return (self.onsets[e][hit, None] + k)[keep], values[keep]
+
+    # ------------------------------------------------------------------
+    # Lazy materialization
+    # ------------------------------------------------------------------
+    def time(self, i0: int = 0, i1: int = None) -> np.ndarray:
+        """(n, 1) time values of samples i0:i1."""
+        i1 = self.N if i1 is None else min(i1, self.N)
+        return (self.start_t + np.arange(i0, i1) * self.dt).reshape(-1, 1)
+
+    def window(self, i0: int = 0, i1: int = None) -> Tuple[np.array, np.array]:
+        """(signals (n, num_electrodes), t (n, 1)) of samples i0:i1; only overlapping bursts are touched."""
+        i1 = self.N if i1 is None else min(i1, self.N)
+        signals = np.zeros((max(i1 - i0, 0), self.num_electrodes))
+        for e in range(self.num_electrodes):
+            idx, values = self._burst_values(e, i0, i1)
+            signals[idx - i0, e] = values
+        return signals, self.time(i0, i1)
+
+    def materialize(self) -> Tuple[np.array, np.array]:
+        """Dense (signals, t), as multi_electrode_waveform returns them."""
+        return self.window(0, self.N)
+
+    def chunks(self, chunk_size: int = 2**16) -> Iterator[Tuple[np.array, np.array]]:
+        for i0 in range(0, self.N, chunk_size):
+            yield self.window(i0, i0 + chunk_size)
+
+    # ------------------------------------------------------------------
+    # Metrics from the templates
+    # ------------------------------------------------------------------
+    def _sum_squares(self):
+        """(num_electrodes,) sum of squared samples, from cumulative template products.
+
+        (c S + s C)^2 = c^2 S^2 + 2 c s S C + s^2 C^2, so every burst costs
+        three lookups in the cumulative sums of S^2, S C and C^2.
+        """
+        out = np.empty(self.num_electrodes)
+        for e in range(self.num_electrodes):
+            S, C = self.sin_templates[e], self.cos_templates[e]
+            cums = [np.concatenate([[0], np.cumsum(x)]) for x in (S * S, S * C, C * C)]
+            k0, k1 = self._played(e)
+            c, s = self.rotations[e].T
+            SS, SC, CC = (cum[k1] - cum[k0] for cum in cums)
+            out[e] = np.sum(c * c * SS + 2 * c * s * SC + s * s * CC)
+        return out
+
+    def rms(self) -> np.ndarray:
+        """(num_electrodes,) RMS over the whole waveform."""
+        return np.sqrt(self._sum_squares() / self.N)
+
+    def energy(self, R: float) -> np.ndarray:
+        """(num_electrodes,) energy in J dissipated by each channel's current in a resistance R (ohms)."""
+        return R * self._sum_squares() * self.dt
+
+    def charge(self, absolute: bool = True) -> np.ndarray:
+        """(num_electrodes,) delivered charge in C (for amplitudes in A); net charge if not absolute.
+
+        Net charge is linear in the templates and comes from their cumulative
+        sums; absolute charge sums |value| over the burst samples only.
+        """
+        out = np.empty(self.num_electrodes)
+        for e in range(self.num_electrodes):
+            if absolute:
+                out[e] = np.sum(np.abs(self._burst_values(e)[1]))
+                continue
+            k0, k1 = self._played(e)
+            cS, cC = (np.concatenate([[0], np.cumsum(x)]) for x in (self.sin_templates[e], self.cos_templates[e]))
+            c, s = self.rotations[e].T
+            out[e] = np.sum(c * (cS[k1] - cS[k0]) + s * (cC[k1] - cC[k0]))
+        return out * self.dt
+
+    def duty_cycle(self) -> np.ndarray:
+        """(num_electrodes,) fraction of samples inside a burst."""
+        played = (self._played(e) for e in range(self.num_electrodes))
+        return np.array([np.sum(k1 - k0) for k0, k1 in played]) / self.N
+
+
+# ----------------------------------------------------------------------------
+# Multi-rate output
+# ----------------------------------------------------------------------------
+class MultiRateWaveform:
+    """
+    Electrode waveforms each sampled at its own rate and for its own duration.
+
+    Channel e holds int(TD_e * f_s_e) samples on np.linspace(start_t,
+    start_t + TD_e), so a 10 kHz channel next to a 1 MHz one stays 100x
+    smaller. Nothing is put on a common clock until aligned() is called.
+
+    Parameters:
+    signals (list) : (N_e,) waveform of every electrode.
+    times (list)   : (N_e,) time values of every electrode.
+    f_s (np.array) : (num_electrodes,) sampling frequency of every electrode in Hz.
+    TD (np.array)  : (num_electrodes,) duration of every electrode in seconds.
+    start_t (float): Start time in seconds.
+    """
+
+    def __init__(self, signals, times, f_s, TD, start_t: float = 0):
+        self.signals = list(signals)
+        self.times = list(times)
+        self.f_s = np.asarray(f_s, dtype=float)
+        self.TD = np.asarray(TD, dtype=float)
+        self.start_t = start_t
+
+    def __len__(self):
+        return len(self.signals)
+
+    def __getitem__(self, e) -> Tuple[np.array, np.array]:
+        """(signal, t) of electrode e, both (N_e,)."""
+        return self.signals[e], self.times[e]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes + t.nbytes for s, t in zip(self.signals, self.times))
+
+    def common_clock(self, f_s: float = None) -> np.ndarray:
+        """(N, 1) time values of the common clock: max(TD) at f_s (default max(f_s)), as multi_electrode_waveform samples."""
+        f_s = np.max(self.f_s) if f_s is None else f_s
+        max_TD = np.max(self.TD)
+        N = int(max_TD * f_s)
+        return np.linspace(start=self.start_t, stop=self.start_t + max_TD, num=N).reshape(-1, 1)
+
+    def aligned(self, f_s: float = None, t: np.ndarray = None) -> Tuple[np.array, np.array]:
+        """
+        Resample every channel onto one clock.
+
+        Channels already on that clock are copied as is; the others are
+        linearly interpolated, and are 0 outside their own duration. With
+        the default clock and equal rates and durations, the result equals
+        multi_electrode_waveform.
+
+        Parameters:
+        f_s (float)        : Common sampling frequency in Hz (default: the highest channel rate).
+        t (np.array)       : Explicit time values to align to, instead of f_s.
+
+        Returns:
+        signals (np.array) : (N, num_electrodes) aligned waveforms.
+        t (np.array)       : (N, 1) time values.
+        """
+        t = self.common_clock(f_s) if t is None else np.asarray(t, dtype=float).reshape(-1, 1)
+        signals = np.zeros((len(t), len(self)))
+        for e, (s, te) in enumerate(zip(self.signals, self.times)):
+            if len(te) == len(t) and np.array_equal(te, t[:, 0]):
+                signals[:, e] = s
+            elif len(te):
+                signals[:, e] = np.interp(t[:, 0], te, s, left=0, right=0)
+        return signals, t
+
+
+def multi_rate_waveform(A, TD, PRF, BD, carrier_f, f_s, num_electrodes: int, start_t: float = 0) -> MultiRateWaveform:
+    """
+    Burst-gated electrode waveforms, each generated at its own f_s and for its own TD.
+
+    Parameters are as in multi_electrode_waveform; samples of every channel
+    are those multi_electrode_waveform would give a single electrode with
+    that channel's parameters.
+
+    Returns:
+    MultiRateWaveform  : per-channel signals and time bases.
+    """
+    params = _electrode_params(A, TD, PRF, BD, carrier_f, f_s, num_electrodes)
+    signals, times = [], []
+    for e in range(num_electrodes):
+        N = int(params['TD'][e] * params['f_s'][e])
+        t = np.linspace(start=start_t, stop=start_t + params['TD'][e], num=N)
+        t_local = t % (1 / params['PRF'][e])
+        bursts = t_local < params['BD'][e]
+        signals.append(params['A'][e] * np.sin(2 * np.pi * params['carrier_f'][e] * t_local) * bursts)
+        times.append(t)
+    return MultiRateWaveform(signals, times, params['f_s'], params['TD'], start_t)